@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+'''
+Script:
+    captchadata.py
+Description:
+    Compact data types of the Bot session data (users in captcha
+    process and scheduled messages deletions).
+Creation date:
+    18/10/2026
+Last modified date:
+    18/10/2026
+Version:
+    1.0.0
+'''
+
+###############################################################################
+# Standard Libraries
+###############################################################################
+
+# Efficient Arrays of Numeric Values Library
+from array import array
+
+# Time Library
+from time import time
+
+# Data Types Hints Library
+from typing import NamedTuple
+
+
+###############################################################################
+# Pending Verification Class
+###############################################################################
+
+class PendingVerification():
+    '''
+    Captcha process data of a new member that needs to solve the
+    captcha challenge.
+    The data is stored in slots and the messages to remove in an array
+    of integers, instead of nested dicts and lists, to reduce the memory
+    used by each user. It is stored as a plain tuple, and it can be
+    created from the nested dicts layout used by older versions, to keep
+    stored sessions compatible.
+    '''
+    __slots__ = (
+        "user_name", "captcha_code", "captcha_mode", "join_time",
+        "captcha_timeout", "join_retries", "kicked_ban", "join_msg",
+        "msg_to_rm"
+    )
+
+    def __init__(
+            self,
+            user_name: str,
+            captcha_code: str,
+            captcha_mode: str,
+            captcha_timeout: int,
+            join_retries: int = 1,
+            kicked_ban: bool = False,
+            join_msg=None,
+            msg_to_rm=(),
+            join_time=None):
+        '''Constructor.'''
+        self.user_name = user_name
+        self.captcha_code = captcha_code
+        self.captcha_mode = captcha_mode
+        self.join_time = time() if join_time is None else join_time
+        self.captcha_timeout = captcha_timeout
+        self.join_retries = join_retries
+        self.kicked_ban = kicked_ban
+        self.join_msg = join_msg
+        self.msg_to_rm = array("q", msg_to_rm)
+
+    def clear_msgs_to_rm(self):
+        '''Clear the list of messages to remove.'''
+        del self.msg_to_rm[:]
+
+    def to_data(self):
+        '''Get the data as a plain tuple (to be stored).'''
+        return (
+            self.user_name, self.captcha_code, self.captcha_mode,
+            self.join_time, self.captcha_timeout, self.join_retries,
+            self.kicked_ban, self.join_msg, tuple(self.msg_to_rm))
+
+    @classmethod
+    def from_data(cls, data):
+        '''
+        Create from the stored plain tuple data (or from older versions
+        nested dicts layout).
+        '''
+        if isinstance(data, cls):
+            return data
+        if isinstance(data, dict):
+            return cls.from_dict(data)
+        (user_name, captcha_code, captcha_mode, join_time, captcha_timeout,
+         join_retries, kicked_ban, join_msg, msg_to_rm) = data
+        return cls(
+            user_name, captcha_code, captcha_mode, captcha_timeout,
+            join_retries, kicked_ban, join_msg, msg_to_rm, join_time)
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        '''Create from older versions nested dicts layout.'''
+        join_data = data.get("join_data", {})
+        return cls(
+            user_name=join_data.get("user_name", ""),
+            captcha_code=join_data.get("captcha_code", ""),
+            captcha_mode=join_data.get("captcha_mode", ""),
+            captcha_timeout=join_data.get("captcha_timeout", 0),
+            join_retries=join_data.get("join_retries", 1),
+            kicked_ban=join_data.get("kicked_ban", False),
+            join_msg=data.get("join_msg", None),
+            msg_to_rm=[
+                msg_id for msg_id in data.get("msg_to_rm", ())
+                if msg_id is not None],
+            join_time=join_data.get("join_time", None))
+
+
+###############################################################################
+# Scheduled Delete Class
+###############################################################################
+
+class ScheduledDelete(NamedTuple):
+    '''
+    Message of a chat to be auto-deleted when its due time arrives.
+    Entries are ordered by due time and then by schedule sequence
+    number, so they can be directly pushed to a priority queue (the
+    sequence number is unique, so chat and message IDs are never
+    compared).
+    '''
+    due_time: float
+    seq: int
+    chat_id: int
+    msg_id: int
+
+    def to_data(self):
+        '''
+        Get the data as a plain tuple (to be stored). The sequence number
+        is not included, as it is stored apart.
+        '''
+        return (self.due_time, self.chat_id, self.msg_id)
+
+    @classmethod
+    def from_data(cls, data, seq: int):
+        '''
+        Create from the stored plain tuple data (or from older versions
+        message data dict layout).
+        '''
+        if isinstance(data, cls):
+            return data._replace(seq=seq)
+        if isinstance(data, dict):
+            return cls.from_dict(data, seq)
+        due_time, chat_id, msg_id = data
+        return cls(due_time, seq, chat_id, msg_id)
+
+    @classmethod
+    def from_dict(cls, data: dict, seq: int):
+        '''Create from older versions message data dict layout.'''
+        return cls(
+            data["time"] + data["delete_time"], seq,
+            data["Chat_id"], data["Msg_id"])
@@ -28,6 +28,12 @@ import logging
 # Operating System Library
 from os import path, makedirs
 
+# Regular Expressions Library
+from re import escape as re_escape
+
+# String Formatting Library
+from string import Formatter
+
 # Persistent RAM data (save/restore "session")
 from pickle import dump as pickle_dump
 from pickle import load as pickle_load
@@ -189,6 +195,103 @@ def list_remove_element(the_list: list, the_element):
     return True
 
 
+def join_texts(texts: list, separator: str, max_length: int):
+    '''
+    Join a list of texts with a separator in as few texts as possible
+    without exceeding a maximum length (texts longer than the maximum
+    length are truncated).
+    '''
+    joined_texts = []
+    current = ""
+    for text in texts:
+        text = text[:max_length]
+        if not current:
+            current = text
+        elif len(current) + len(separator) + len(text) <= max_length:
+            current = f"{current}{separator}{text}"
+        else:
+            joined_texts.append(current)
+            current = text
+    if current:
+        joined_texts.append(current)
+    return joined_texts
+
+
+def regex_trie(words: list):
+    '''
+    Get a regular expression alternation that matches any of the given
+    words, factorized as a prefix tree (i.e. ["com", "cat", "co"] ->
+    "c(?:at|om?)"). This avoids the regex engine to check each word of
+    a large alternation from the start.
+    '''
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return regex_trie_node(trie)
+
+
+def regex_trie_node(node: dict):
+    '''
+    Get the regular expression of a prefix tree node (see regex_trie()).
+    '''
+    optional = "" in node
+    alternatives = []
+    single_chars = []
+    for char in sorted(node):
+        if char == "":
+            continue
+        sub_regex = regex_trie_node(node[char])
+        if sub_regex == "":
+            single_chars.append(re_escape(char))
+        else:
+            alternatives.append(f"{re_escape(char)}{sub_regex}")
+    if len(single_chars) == 1:
+        alternatives.append(single_chars[0])
+    elif len(single_chars) > 1:
+        alternatives.append(f'[{"".join(single_chars)}]')
+    if not alternatives:
+        return ""
+    if (len(alternatives) == 1) and (len(single_chars) <= 1 or
+                                     not optional):
+        regex = alternatives[0]
+        if optional:
+            if (len(single_chars) == 0) and (len(regex) > 1):
+                regex = f"(?:{regex})"
+            regex = f"{regex}?"
+        return regex
+    regex = f'(?:{"|".join(alternatives)})'
+    if optional:
+        regex = f"{regex}?"
+    return regex
+
+
+def format_explicit_fields(text: str):
+    '''
+    Get a format string with all automatic numbered replacement fields
+    converted to explicit numbered ones (i.e. "{} and {}" -> "{0} and
+    {1}"), so it can be joined with other format string and formatted
+    with the same arguments.
+    '''
+    result = []
+    auto_index = 0
+    for literal, field, format_spec, conversion in Formatter().parse(text):
+        result.append(literal.replace("{", "{{").replace("}", "}}"))
+        if field is None:
+            continue
+        if field == "":
+            field = str(auto_index)
+            auto_index = auto_index + 1
+        if conversion:
+            field = f"{field}!{conversion}"
+        if format_spec:
+            field = f"{field}:{format_spec}"
+        result.append(f"{{{field}}}")
+    return "".join(result)
+
+
 def pickle_save(pickle_file_path: str, data):
     '''
     Save data to pickle file.
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+
+'''
+Script:
+    configdb.py
+Description:
+    SQLite storage of chats configurations, as an alternative to the
+    per-chat JSON config files. Each chat configuration property is
+    stored in its own row, so changing a property doesn't rewrite the
+    whole chat configuration.
+Creation date:
+    18/10/2026
+Last modified date:
+    18/10/2026
+Version:
+    1.0.0
+'''
+
+###############################################################################
+# Standard Libraries
+###############################################################################
+
+# Logging Library
+import logging
+
+# Collections Data Types Library
+from collections import OrderedDict
+
+# JSON Library
+from json import dumps as json_dumps
+from json import loads as json_loads
+
+# Operating System Library
+from os import listdir
+from os import makedirs as os_makedirs
+from os import path as os_path
+
+# SQLite Database Library
+import sqlite3
+
+# Threads and Multi-tasks Library
+from threading import Lock
+
+# Error Traceback Library
+from traceback import format_exc
+
+
+###############################################################################
+# Local Libraries
+###############################################################################
+
+# Thread-Safe JSON Library
+from tsjson import TSjson
+
+
+###############################################################################
+# Logger Setup
+###############################################################################
+
+logger = logging.getLogger(__name__)
+
+
+###############################################################################
+# Constants
+###############################################################################
+
+# Database tables creation queries
+DB_TABLES = [
+    "CREATE TABLE IF NOT EXISTS chat_config ("
+    "chat_id INTEGER NOT NULL, param TEXT NOT NULL, value TEXT, "
+    "PRIMARY KEY (chat_id, param)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS meta ("
+    "key TEXT PRIMARY KEY, value TEXT)"
+]
+
+# Number of chats imported between each import progress log
+IMPORT_LOG_INTERVAL = 10000
+
+
+###############################################################################
+# Chats Config Database Class
+###############################################################################
+
+class ConfigDB():
+    '''
+    Chats configurations SQLite storage.
+    '''
+
+    def __init__(self, file_path):
+        '''Constructor.'''
+        self.file_path = file_path
+        self.lock = Lock()
+        self.db = None
+
+    def open(self):
+        '''Open (or create) the chats config database.'''
+        try:
+            directory = os_path.dirname(self.file_path)
+            if directory and not os_path.exists(directory):
+                os_makedirs(directory)
+            self.db = sqlite3.connect(
+                self.file_path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            for query in DB_TABLES:
+                self.db.execute(query)
+            self.db.commit()
+        except Exception:
+            logger.error(format_exc())
+            logger.error("Fail to open config database %s", self.file_path)
+            self.db = None
+            return False
+        return True
+
+    def close(self):
+        '''Compact the database journal and close it.'''
+        if self.db is None:
+            return
+        try:
+            with self.lock:
+                self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                self.db.close()
+        except Exception:
+            logger.error(format_exc())
+        self.db = None
+
+    def read(self, chat_id):
+        '''
+        Get all stored configuration properties of a chat ({} if the
+        chat has no stored configuration, None if the read fails).
+        '''
+        config_data = OrderedDict()
+        try:
+            with self.lock:
+                for param, value in self.db.execute(
+                        "SELECT param, value FROM chat_config "
+                        "WHERE chat_id=?", (chat_id,)):
+                    config_data[param] = json_loads(value)
+        except Exception:
+            logger.error(format_exc())
+            logger.error("[%s] Fail to read config from database", chat_id)
+            return None
+        return config_data
+
+    def write_property(self, chat_id, param, value):
+        '''Store a configuration property of a chat.'''
+        return self.write(chat_id, {param: value})
+
+    def write(self, chat_id, config_data):
+        '''Store the provided configuration properties of a chat.'''
+        if not config_data:
+            return False
+        rows = [
+            (chat_id, param, json_dumps(value, ensure_ascii=False))
+            for param, value in config_data.items()
+        ]
+        try:
+            with self.lock:
+                with self.db:
+                    self.db.executemany(
+                        "INSERT OR REPLACE INTO chat_config "
+                        "VALUES (?, ?, ?)", rows)
+        except Exception:
+            logger.error(format_exc())
+            logger.error("[%s] Fail to write config to database", chat_id)
+            return False
+        return True
+
+    def get_meta(self, key):
+        '''Get a database metadata value (None if it doesn't exists).'''
+        with self.lock:
+            row = self.db.execute(
+                "SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        if row is None:
+            return None
+        return row[0]
+
+    def set_meta(self, key, value):
+        '''Set a database metadata value.'''
+        with self.lock:
+            with self.db:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    def import_json_tree(self, chats_dir, config_file_name):
+        '''
+        Import the chats configurations from the JSON config files tree
+        (<chats_dir>/<chat_id>/<config_file_name>). The import is done
+        just once, later calls does nothing.
+        Returns the number of imported chats.
+        '''
+        if self.get_meta("json_tree_imported") is not None:
+            return 0
+        num_imported = 0
+        if os_path.exists(chats_dir):
+            logger.info("Importing chats config from %s...", chats_dir)
+            for f_chat_id in listdir(chats_dir):
+                file_path = f"{chats_dir}/{f_chat_id}/{config_file_name}"
+                if not os_path.exists(file_path):
+                    continue
+                config_data = TSjson(file_path).read()
+                if not config_data:
+                    continue
+                chat_id = f_chat_id
+                try:
+                    chat_id = int(f_chat_id)
+                except ValueError:
+                    pass
+                if not self.write(chat_id, config_data):
+                    # Try again the whole import in next startup
+                    return num_imported
+                num_imported = num_imported + 1
+                if num_imported % IMPORT_LOG_INTERVAL == 0:
+                    logger.info("Imported %d chats config", num_imported)
+        self.set_meta("json_tree_imported", chats_dir)
+        logger.info("Chats config import completed (%d chats)", num_imported)
+        return num_imported
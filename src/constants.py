@@ -107,6 +107,16 @@ CONST = {
     "CHATS_DIR":
         os_getenv("CAPTCHABOT_CHATS_DIR", SETTINGS["CAPTCHABOT_CHATS_DIR"]),
 
+    # Chats configurations storage backend ("json" or "sqlite")
+    "CHATS_CONFIG_BACKEND":
+        os_getenv("CAPTCHABOT_CHATS_CONFIG_BACKEND",
+                  SETTINGS["CAPTCHABOT_CHATS_CONFIG_BACKEND"]).lower(),
+
+    # Chats configurations SQLite database file path
+    "F_CHATS_CONFIG_DB":
+        os_getenv("CAPTCHABOT_CHATS_CONFIG_DB",
+                  SETTINGS["CAPTCHABOT_CHATS_CONFIG_DB"]),
+
     # Directory where create/generate temporary captchas
     "CAPTCHAS_DIR":
         os_getenv("CAPTCHABOT_CAPTCHAS_DIR",
@@ -263,9 +273,77 @@ CONST = {
         int(os_getenv("CAPTCHABOT_TIME_VIDEO_GEN_INTERVAL_S",
                       SETTINGS["CAPTCHABOT_TIME_VIDEO_GEN_INTERVAL_S"])),
 
-    # Last session restorable RAM data backup file path
+    # Video Captchas cache chat (where upload them once)
+    "VIDEO_CAPTCHAS_CACHE_CHAT":
+        os_getenv("CAPTCHABOT_VIDEO_CAPTCHAS_CACHE_CHAT",
+                  SETTINGS["CAPTCHABOT_VIDEO_CAPTCHAS_CACHE_CHAT"]),
+
+    # Groups Administrators list cache time (in seconds)
+    "T_ADMINS_CACHE":
+        int(os_getenv("CAPTCHABOT_T_ADMINS_CACHE",
+                      SETTINGS["CAPTCHABOT_T_ADMINS_CACHE"])),
+
+    # Number of worker processes to generate image captchas
+    "IMG_CAPTCHA_WORKERS":
+        int(os_getenv("CAPTCHABOT_IMG_CAPTCHA_WORKERS",
+                      SETTINGS["CAPTCHABOT_IMG_CAPTCHA_WORKERS"])),
+
+    # Number of pre-generated image captchas of each mode and difficulty
+    "IMG_CAPTCHA_POOL_SIZE":
+        int(os_getenv("CAPTCHABOT_IMG_CAPTCHA_POOL_SIZE",
+                      SETTINGS["CAPTCHABOT_IMG_CAPTCHA_POOL_SIZE"])),
+
+    # Image captchas pool refill threshold
+    "IMG_CAPTCHA_POOL_LOW":
+        int(os_getenv("CAPTCHABOT_IMG_CAPTCHA_POOL_LOW",
+                      SETTINGS["CAPTCHABOT_IMG_CAPTCHA_POOL_LOW"])),
+
+    # Keep generated image captchas in memory (no temporary files)
+    "IMG_CAPTCHA_IN_MEMORY":
+        bool(int(os_getenv("CAPTCHABOT_IMG_CAPTCHA_IN_MEMORY",
+                           SETTINGS["CAPTCHABOT_IMG_CAPTCHA_IN_MEMORY"]))),
+
+    # Maximum number of updates processed at the same time
+    "MAX_CONCURRENT_UPDATES":
+        int(os_getenv("CAPTCHABOT_MAX_CONCURRENT_UPDATES",
+                      SETTINGS["CAPTCHABOT_MAX_CONCURRENT_UPDATES"])),
+
+    # Maximum number of pending updates of a group
+    "MAX_CHAT_PENDING_UPDATES":
+        int(os_getenv("CAPTCHABOT_MAX_CHAT_PENDING_UPDATES",
+                      SETTINGS["CAPTCHABOT_MAX_CHAT_PENDING_UPDATES"])),
+
+    # Bot API requests global rate limit (requests per second)
+    "API_RATE_GLOBAL":
+        float(os_getenv("CAPTCHABOT_API_RATE_GLOBAL",
+                        SETTINGS["CAPTCHABOT_API_RATE_GLOBAL"])),
+
+    # Bot API messages rate limit of each group (messages per minute)
+    "API_RATE_GROUP":
+        float(os_getenv("CAPTCHABOT_API_RATE_GROUP",
+                        SETTINGS["CAPTCHABOT_API_RATE_GROUP"])),
+
+    # Number of joins in a group that enables raid mode
+    "RAID_JOINS":
+        int(os_getenv("CAPTCHABOT_RAID_JOINS",
+                      SETTINGS["CAPTCHABOT_RAID_JOINS"])),
+
+    # Raid detection time window (in seconds)
+    "RAID_WINDOW":
+        int(os_getenv("CAPTCHABOT_RAID_WINDOW",
+                      SETTINGS["CAPTCHABOT_RAID_WINDOW"])),
+
+    # Captcha result messages aggregation time (in seconds)
+    "T_RESULT_MSGS_WINDOW":
+        float(os_getenv("CAPTCHABOT_T_RESULT_MSGS_WINDOW",
+                        SETTINGS["CAPTCHABOT_T_RESULT_MSGS_WINDOW"])),
+
+    # Last session restorable RAM data backup file path (older versions)
     "F_SESSION": SCRIPT_PATH + "/session.pkl",
 
+    # Session data database file path
+    "F_SESSION_DB": SCRIPT_PATH + "/session.db",
+
     # Languages texts files directory path
     "LANG_DIR": SCRIPT_PATH + "/language",
 
@@ -292,6 +370,45 @@ CONST = {
         int(os_getenv("CAPTCHABOT_T_RESTRICT_NO_TEXT_MSG",
                       SETTINGS["CAPTCHABOT_T_RESTRICT_NO_TEXT_MSG"])),
 
+    # Maximum time that auto-delete messages and captcha timeout
+    # coroutines sleep between checks if there is nothing to handle
+    # before (in seconds)
+    # Note: new deadlines and the Bot exit wake up the coroutines, so
+    # this is just an idle safety check
+    "T_COROUTINES_MAX_SLEEP": 60,
+
+    # Minimum time of a temporal restriction (Telegram considers shorter
+    # restrictions as forever) (in seconds)
+    "T_RESTRICT_MIN": 31,
+
+    # Time between checks of the chats in raid mode, to return them to
+    # normal mode when the raid finishes (in seconds)
+    "T_RAID_CHECK": 1,
+
+    # Time in advance that an auto-delete message can be removed, to be
+    # removed in the same request with other messages of its chat that
+    # must be removed now (in seconds)
+    "T_DEL_MSG_COALESCE": 2,
+
+    # Minimum time that a group keeps in raid mode since the last time
+    # its joins rate reached the raid threshold (in seconds)
+    "T_RAID_COOLDOWN": 60,
+
+    # Maximum time to wait for the captcha results of the users that
+    # joined during a raid before sending the raid summary (in seconds)
+    "T_RAID_RESULTS_WAIT": 1800,
+
+    # Time between session data changes writes to database (in seconds)
+    "T_SESSION_FLUSH": 1,
+
+    # Time to forget a kicked user that has not solve the captcha (in
+    # seconds, counted from the captcha timeout)
+    "T_FORGET_KICKED_USER": 1800,
+
+    # Minimum time between checks for modifications of global lists
+    # files (allowed users, allowed groups and banned groups)
+    "T_LIST_FILES_CHECK": 60,
+
     # Number of seconds in a minute
     "T_SECONDS_IN_MIN": 60,
 
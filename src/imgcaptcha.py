@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+'''
+Script:
+    imgcaptcha.py
+Description:
+    Image captcha generation functions to be run in worker processes,
+    so images rendering doesn't block the Bot asyncio event loop.
+    Note: The worker processes are spawned, so each one imports the Bot
+    main script again (as "__mp_main__", which skips the creation of
+    the Bot objects) besides this module. The functions run by them
+    can't use any Bot state, just their arguments.
+Creation date:
+    18/10/2026
+Last modified date:
+    18/10/2026
+Version:
+    1.0.0
+'''
+
+###############################################################################
+# Standard Libraries
+###############################################################################
+
+# Input-Output Library
+from io import BytesIO
+
+# Operating System Library
+from os import makedirs, path, remove
+
+# Random Library
+from random import randint as random_randint
+
+
+###############################################################################
+# Third-Party Libraries
+###############################################################################
+
+# Image Captcha Generator Library
+from multicolorcaptcha import CaptchaGenerator as MultiColorCaptchaGenerator
+
+
+###############################################################################
+# Worker Process Data
+###############################################################################
+
+# Image Captcha Generator object of the worker process
+# (created at worker startup, 2 -> 640x360 size)
+CaptchaGenImage = None
+
+
+###############################################################################
+# Functions
+###############################################################################
+
+def img_captcha_worker_init():
+    '''
+    Worker process initialization, create the Image Captcha Generator
+    object of the process.
+    '''
+    global CaptchaGenImage
+    CaptchaGenImage = MultiColorCaptchaGenerator(2)
+
+
+def gen_image_captcha(img_file_path, difficult_level, captcha_mode):
+    '''
+    Generate an image captcha from pseudo numbers and save it to the
+    specified file path. If no file path is specified, the PNG image
+    data is returned in the result instead of being saved to a file.
+    '''
+    if CaptchaGenImage is None:
+        img_captcha_worker_init()
+    if img_file_path is not None:
+        # If it doesn't exists, create captchas folder to store them
+        img_dir_path = path.dirname(img_file_path)
+        if not path.exists(img_dir_path):
+            makedirs(img_dir_path, exist_ok=True)
+        else:
+            # If the captcha file exists remove it
+            if path.exists(img_file_path):
+                remove(img_file_path)
+    # Generate and save the captcha with a random background
+    # mono-color or multi-color
+    captcha_result = {
+        "image": img_file_path,
+        "characters": "",
+        "equation_str": "",
+        "equation_result": ""
+    }
+    if captcha_mode == "math":
+        captcha = CaptchaGenImage.gen_math_captcha_image(
+            2, bool(random_randint(0, 1)))
+        captcha_result["equation_str"] = captcha["equation_str"]
+        captcha_result["equation_result"] = captcha["equation_result"]
+    else:
+        captcha = CaptchaGenImage.gen_captcha_image(
+            difficult_level, captcha_mode, bool(random_randint(0, 1)))
+        captcha_result["characters"] = captcha["characters"]
+    if img_file_path is None:
+        img_data = BytesIO()
+        captcha["image"].save(img_data, "png")
+        captcha_result["image"] = img_data.getvalue()
+    else:
+        captcha["image"].save(img_file_path, "png")
+    return captcha_result
@@ -27,19 +27,45 @@ import logging
 
 # Asynchronous Input-Output Concurrency Library
 from asyncio import create_task as asyncio_create_task
+from asyncio import gather as asyncio_gather
 from asyncio import sleep as asyncio_sleep
+from asyncio import wait as asyncio_wait
+from asyncio import FIRST_COMPLETED as ASYNCIO_FIRST_COMPLETED
+from asyncio import Event as AsyncioEvent
+from asyncio import Lock as AsyncioLock
+from asyncio import get_running_loop as asyncio_get_running_loop
+from asyncio import to_thread as asyncio_to_thread
 
 # Collections Data Types Library
-from collections import OrderedDict
+from collections import OrderedDict, deque
+
+# Concurrent Execution Library
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Data Copy Library
+from copy import deepcopy
 
 # Date and Time Library
 from datetime import datetime, timedelta, timezone
 
+# Heap Queue (Priority Queue) Library
+from heapq import heapify, heappop, heappush
+
+# Input-Output Library
+from io import BytesIO
+
+# Iterators Library
+from itertools import count as itertools_count
+
+# Multiprocessing Library
+from multiprocessing import get_context as multiprocessing_get_context
+
 # JSON Library
 from json import dumps as json_dumps
 
 # Operating System Library
-from os import path, remove, makedirs, listdir
+from os import path, remove, makedirs, stat
 
 # File System Path Library
 from pathlib import Path
@@ -66,7 +92,7 @@ from time import time
 from traceback import format_exc
 
 # Built-in Data Types Library
-from types import CoroutineType
+from types import CoroutineType, MappingProxyType
 
 # Data Types Library
 from typing import Optional
@@ -82,9 +108,6 @@ from manim_captcha.auto_generator import (
 )
 from manim_captcha.scenes import CaptchaScene
 
-# Image Captcha Generator Library
-from multicolorcaptcha import CaptchaGenerator as MultiColorCaptchaGenerator
-
 # Python-Telegram_Bot Core Library
 from telegram import (
     Update, Chat, InputMediaPhoto, InlineKeyboardButton,
@@ -118,19 +141,26 @@ from telegram.error import (
 from tlgbotutils import (
     tlg_add_cmd, tlg_get_chat_admins, tlg_send_msg, tlg_send_image,
     tlg_send_poll, tlg_send_video, tlg_stop_poll, tlg_answer_callback_query,
-    tlg_delete_msg, tlg_edit_msg_media, tlg_ban_user, tlg_kick_user,
+    tlg_delete_msg, tlg_delete_msgs, tlg_edit_msg_media, tlg_ban_user,
+    tlg_kick_user,
     tlg_user_is_admin, tlg_leave_chat, tlg_restrict_user, tlg_unrestrict_user,
     tlg_is_valid_user_id_or_alias, tlg_is_valid_group, tlg_alias_in_string,
     tlg_extract_members_status_change, tlg_get_msg,
     tlg_is_a_channel_msg_on_discussion_group, tlg_get_user_name,
     tlg_member_has_join_group, tlg_member_has_left_group, tlg_get_msg_topic,
-    tlg_get_embedded_url_in_msg, tlg_is_msg_forwarded
+    tlg_get_embedded_url_in_msg, tlg_is_msg_forwarded,
+    tlg_set_chat_admins_cache_ttl, tlg_invalidate_chat_admins,
+    tlg_member_admin_status_change, tlg_get_update_chat_id,
+    tlg_set_rate_limits, tlg_get_rate_limiter_stats,
+    tlg_get_member_actions_stats, ChatUpdateProcessor,
+    TLG_PRIORITY_HIGH, TLG_MAX_MSG_LEN
 )
 
 # Commons Library
 from commons import (
     is_int, add_lrm, file_exists, file_write, file_read,
-    list_remove_element, get_unix_epoch, pickle_save, pickle_restore
+    list_remove_element, get_unix_epoch, pickle_restore,
+    regex_trie, format_explicit_fields, join_texts
 )
 
 # Constants Library
@@ -138,8 +168,20 @@ from constants import (
     SCRIPT_PATH, CONST, TEXT, CMD, CAPTCHA_MODES, ADMIN_CALL_KEYWORDS
 )
 
+# Image Captcha Generation Library
+from imgcaptcha import gen_image_captcha, img_captcha_worker_init
+
+# Session Data Storage Library
+from sessiondb import SessionDB
+
+# Captcha Process Data Types Library
+from captchadata import PendingVerification, ScheduledDelete
+
+# Chats Config Database Library
+from configdb import ConfigDB
+
 # Thread-Safe JSON Library
-from tsjson import TSjson
+from tsjson import TSjson, TSjsonWriter
 
 
 ###############################################################################
@@ -161,13 +203,35 @@ logger = logging.getLogger(__name__)
 
 class Globals():
     '''Global Elements Container.'''
-    files_config_list: list = []
+    chat_config_files: dict = {}
+    chat_configs: dict = {}
+    chat_configs_hits: int = 0
+    chat_configs_misses: int = 0
+    chat_msg_profiles: dict = {}
+    list_files: dict = {}
+    regex_urls: Optional[re.Pattern] = None
     to_delete_in_time_messages_list: list = []
+    to_delete_in_time_messages_seq = itertools_count()
+    auto_delete_wakeup: Optional[AsyncioEvent] = None
     new_users: dict = {}
+    captcha_deadlines: dict = {}
+    captcha_deadlines_list: list = []
+    captcha_timeout_wakeup: Optional[AsyncioEvent] = None
+    raid_chats: dict = {}
+    result_msgs: dict = {}
     connections: dict = {}
     async_captcha_timeout: Optional[CoroutineType] = None
     async_auto_delete_messages: Optional[CoroutineType] = None
+    async_session_flush: Optional[CoroutineType] = None
+    img_captcha_executor: Optional[ProcessPoolExecutor] = None
+    img_captcha_executor_gen: int = 0
+    img_captcha_executor_lock: Optional[AsyncioLock] = None
+    img_captchas_pool: dict = {}
+    img_captchas_pool_tasks: dict = {}
+    img_captchas_pool_seq = itertools_count()
+    video_captchas_file_id: dict = {}
     force_exit: bool = False
+    exit_requested: Optional[AsyncioEvent] = None
 
 
 ###############################################################################
@@ -177,17 +241,32 @@ class Globals():
 # Global Data Elements
 Global = Globals()
 
-# Create Video Captcha Generator object
-CaptchaGenVideo = ManimCaptchaGenerator(Path(CONST["CAPTCHAS_DIR_VIDEO"]),
-                                        CONST["TIME_VIDEO_GEN_INTERVAL_S"],
-                                        CONST["MAX_NUM_VIDEO_CAPTCHAS"])
+# Note: The image captcha worker processes are spawned, so each one
+# imports this script again as "__mp_main__" module. The Bot objects are
+# not used by them, so they are just created in the Bot process
+if __name__ != "__mp_main__":
+
+    # Create Video Captcha Generator object
+    CaptchaGenVideo = ManimCaptchaGenerator(
+        Path(CONST["CAPTCHAS_DIR_VIDEO"]),
+        CONST["TIME_VIDEO_GEN_INTERVAL_S"],
+        CONST["MAX_NUM_VIDEO_CAPTCHAS"])
+
+    # Session data persistent storage
+    SessionData = SessionDB(
+        CONST["F_SESSION_DB"], PendingVerification.to_data,
+        PendingVerification.from_data, ScheduledDelete.to_data,
+        ScheduledDelete.from_data)
 
-# Create Image Captcha Generator object of specified size (2 -> 640x360)
-CaptchaGenImage = MultiColorCaptchaGenerator(2)
+    # Chats config database (just used with "sqlite" config backend)
+    ConfigData = ConfigDB(CONST["F_CHATS_CONFIG_DB"])
+
+    # Chats config JSON files background writer
+    JsonWriter = TSjsonWriter()
 
 
 ###############################################################################
-# JSON Chat Config File Functions
+# Chat Config Storage Functions
 ###############################################################################
 
 def get_default_config_data():
@@ -223,82 +302,319 @@ def get_default_config_data():
     return config_data
 
 
+def load_chat_config(chat_id):
+    '''
+    Get the in-memory configuration data of a chat. The chat config file
+    is just read from disk the first time the chat is accessed (cache
+    miss), any later access is served from RAM (cache hit).
+    Any missing property of a stored chat config is filled with its
+    default value and stored in a single write.
+    '''
+    chat_id = normalize_chat_id(chat_id)
+    config_data = Global.chat_configs.get(chat_id, None)
+    if config_data is not None:
+        Global.chat_configs_hits = Global.chat_configs_hits + 1
+        return config_data
+    Global.chat_configs_misses = Global.chat_configs_misses + 1
+    if CONST["CHATS_CONFIG_BACKEND"] == "sqlite":
+        config_data = ConfigData.read(chat_id)
+        stored = bool(config_data)
+    else:
+        chat_file = get_chat_config_file(chat_id)
+        config_data = chat_file.read()
+        # Chats with directory but without config file gets the default
+        # config stored
+        stored = bool(config_data) or \
+            path.exists(path.dirname(chat_file.file_name))
+    if config_data is None:
+        # Read fail, don't overwrite the stored config
+        stored = False
+        config_data = {}
+    missing_config = OrderedDict()
+    for param, value in get_default_config_data().items():
+        if param not in config_data:
+            missing_config[param] = value
+            config_data[param] = value
+    if stored and missing_config:
+        if CONST["CHATS_CONFIG_BACKEND"] == "sqlite":
+            ConfigData.write(chat_id, missing_config)
+        else:
+            chat_file.write_async(config_data)
+    Global.chat_configs[chat_id] = config_data
+    return config_data
+
+
 def save_config_property(chat_id, param, value):
     '''
     Store actual chat configuration in file.
+    The in-memory chat config is updated and written through to disk
+    (JSON config files are written by a background writer thread).
     '''
-    fjson_config = get_chat_config_file(chat_id)
-    config_data = fjson_config.read()
-    if not config_data:
-        config_data = get_default_config_data()
+    config_data = load_chat_config(chat_id)
     if (param in config_data) and (value == config_data[param]):
         return
-    config_data[param] = value
-    fjson_config.write(config_data)
+    config_data[param] = deepcopy(value)
+    if param in ("Language", "BiLang"):
+        Global.chat_msg_profiles.pop(normalize_chat_id(chat_id), None)
+    if CONST["CHATS_CONFIG_BACKEND"] == "sqlite":
+        ConfigData.write_property(
+            normalize_chat_id(chat_id), param, config_data[param])
+    else:
+        get_chat_config_file(chat_id).write_async(config_data)
 
 
 def get_chat_config(chat_id, param):
     '''
     Get specific stored chat configuration property.
+    Note: a copy is returned for list values, so the caller can modify
+    it without altering the cached config until it is saved.
     '''
-    file = get_chat_config_file(chat_id)
-    if file:
-        config_data = file.read()
-        if (not config_data) or (param not in config_data):
-            config_data = get_default_config_data()
-            save_config_property(chat_id, param, config_data[param])
-    else:
-        config_data = get_default_config_data()
-        save_config_property(chat_id, param, config_data[param])
-    return config_data[param]
+    config_data = load_chat_config(chat_id)
+    if param not in config_data:
+        save_config_property(
+            chat_id, param, get_default_config_data()[param])
+    value = config_data[param]
+    if isinstance(value, (list, dict)):
+        value = deepcopy(value)
+    return value
 
 
 def get_all_chat_config(chat_id):
     '''
     Get specific stored chat configuration property.
     '''
-    file = get_chat_config_file(chat_id)
-    if file:
-        config_data = file.read()
-        if not config_data:
-            config_data = get_default_config_data()
-    else:
-        config_data = get_default_config_data()
-    return config_data
+    return deepcopy(load_chat_config(chat_id))
+
+
+def normalize_chat_id(chat_id):
+    '''
+    Get chat ID as integer, no matter if it was provided as an integer
+    or as a string (i.e. chat directory name), to ensure any chat is
+    always registered and accessed with the same key.
+    '''
+    if isinstance(chat_id, str) and is_int(chat_id):
+        return int(chat_id)
+    return chat_id
 
 
 def get_chat_config_file(chat_id):
     '''
-    Determine chat config file from the list by ID. Get the file if
+    Determine chat config file from the registry by ID. Get the file if
     exists or create it if not.
     '''
-    file = OrderedDict([("ID", chat_id), ("File", None)])
-    found = False
-    if Global.files_config_list:
-        for chat_file in Global.files_config_list:
-            if chat_file["ID"] == chat_id:
-                file = chat_file
-                found = True
-                break
-        if not found:
-            chat_config_file_name = \
-                f'{CONST["CHATS_DIR"]}/{chat_id}/{CONST["F_CONF"]}'
-            file["ID"] = chat_id
-            file["File"] = TSjson(chat_config_file_name)
-            Global.files_config_list.append(file)
-    else:
+    chat_id = normalize_chat_id(chat_id)
+    file = Global.chat_config_files.get(chat_id, None)
+    if file is None:
         chat_config_file_name = \
             f'{CONST["CHATS_DIR"]}/{chat_id}/{CONST["F_CONF"]}'
-        file["ID"] = chat_id
-        file["File"] = TSjson(chat_config_file_name)
-        Global.files_config_list.append(file)
-    return file["File"]
+        file = TSjson(chat_config_file_name, JsonWriter)
+        Global.chat_config_files[chat_id] = file
+    return file
+
+
+###############################################################################
+# Chat Messages Texts Functions
+###############################################################################
+
+def get_chat_msg_profile(chat_id):
+    '''
+    Get the messages profile of a chat (configured language, bilanguage
+    and message templates already built for that configuration).
+    The profile is built on first use and discarded when the chat
+    language or bilanguage configuration changes.
+    '''
+    chat_id = normalize_chat_id(chat_id)
+    profile = Global.chat_msg_profiles.get(chat_id, None)
+    if profile is None:
+        lang = get_chat_config(chat_id, "Language")
+        bilang = (lang != "EN") and get_chat_config(chat_id, "BiLang")
+        profile = {"lang": lang, "bilang": bilang, "templates": {}}
+        Global.chat_msg_profiles[chat_id] = profile
+    return profile
+
+
+def get_chat_msg(chat_id, text_key, *args):
+    '''
+    Get a message text in the chat language, followed by the english
+    one if bilanguage is enabled, formatted with the provided arguments.
+    '''
+    profile = get_chat_msg_profile(chat_id)
+    template = profile["templates"].get(text_key, None)
+    if template is None:
+        template = TEXT[profile["lang"]][text_key]
+        if profile["bilang"]:
+            template = format_explicit_fields(template)
+            en_template = format_explicit_fields(TEXT["EN"][text_key])
+            template = f"{template}\n\n{en_template}"
+        profile["templates"][text_key] = template
+    return template.format(*args)
+
+
+###############################################################################
+# Raid Mode Functions
+###############################################################################
+
+async def raid_mode_join(bot, chat_id, user_id):
+    '''
+    Register a new member join and check the chat joins rate. The chat
+    enters in raid mode when RAID_JOINS users join it in RAID_WINDOW
+    seconds (the users that joined in that time window are considered
+    part of the raid).
+    '''
+    if CONST["RAID_JOINS"] <= 0:
+        return
+    now = time()
+    raid = Global.raid_chats.get(chat_id, None)
+    if raid is None:
+        raid = {
+            "joins": deque(), "active": False, "last_peak": 0.0,
+            "users": set(), "stats": None
+        }
+        Global.raid_chats[chat_id] = raid
+    joins = raid["joins"]
+    joins.append((now, user_id))
+    while joins[0][0] < now - CONST["RAID_WINDOW"]:
+        joins.popleft()
+    if raid["active"]:
+        raid_mode_add_user(raid, user_id)
+    if len(joins) < CONST["RAID_JOINS"]:
+        return
+    raid["last_peak"] = now
+    if raid["active"]:
+        return
+    raid["active"] = True
+    if raid["stats"] is None:
+        raid["stats"] = {
+            "joins": 0, "solved": 0, "kicked": 0, "banned": 0,
+            "restricted": 0, "left": 0
+        }
+    for _, join_user_id in joins:
+        raid_mode_add_user(raid, join_user_id)
+    # Wake up the captcha timeout coroutine to check the raid periodically
+    if Global.captcha_timeout_wakeup is not None:
+        Global.captcha_timeout_wakeup.set()
+    logger.warning("[%s] Raid detected (%d joins in %ds), raid mode enabled",
+                   chat_id, len(joins), CONST["RAID_WINDOW"])
+    msg_text = get_chat_msg(
+        chat_id, "RAID_MODE_START", len(joins), CONST["RAID_WINDOW"])
+    rm_result_msg = get_chat_config(chat_id, "Rm_Result_Msg")
+    await tlg_bot_send_msg(bot, chat_id, msg_text, rm_result_msg)
+
+
+def raid_mode_add_user(raid, user_id):
+    '''Add an user to the users that joined a chat during a raid.'''
+    if user_id not in raid["users"]:
+        raid["users"].add(user_id)
+        raid["stats"]["joins"] = raid["stats"]["joins"] + 1
+
+
+def is_any_raid_in_progress():
+    '''
+    Check if any chat is in raid mode or waiting to notify its raid
+    summary.
+    '''
+    for raid in Global.raid_chats.values():
+        if raid["active"] or (raid["stats"] is not None):
+            return True
+    return False
+
+
+def is_raid_mode(chat_id):
+    '''Check if a chat is in raid mode.'''
+    raid = Global.raid_chats.get(chat_id, None)
+    return (raid is not None) and raid["active"]
+
+
+def raid_mode_result(chat_id, user_id, result):
+    '''
+    Count the captcha result of an user that joined during a raid, or
+    of any user while the chat is in raid mode, to notify it in the raid
+    summary instead of with an individual message.
+    Returns True if the result has been counted (so the individual
+    result message must not be sent).
+    '''
+    raid = Global.raid_chats.get(chat_id, None)
+    if (raid is None) or (raid["stats"] is None):
+        return False
+    if (not raid["active"]) and (user_id not in raid["users"]):
+        return False
+    raid["users"].discard(user_id)
+    raid["stats"][result] = raid["stats"][result] + 1
+    return True
+
+
+async def raid_mode_check(bot):
+    '''
+    Return to normal mode the chats in raid mode which joins rate has
+    dropped (below half the raid threshold for T_RAID_COOLDOWN seconds),
+    and send the raid summary when all the users that joined during the
+    raid have completed (or failed) the captcha.
+    '''
+    now = time()
+    for chat_id, raid in list(Global.raid_chats.items()):
+        joins = raid["joins"]
+        while joins and (joins[0][0] < now - CONST["RAID_WINDOW"]):
+            joins.popleft()
+        if raid["active"]:
+            if (len(joins) * 2 < CONST["RAID_JOINS"]) and \
+                    (now - raid["last_peak"] >= CONST["T_RAID_COOLDOWN"]):
+                logger.info("[%s] Raid finished, raid mode disabled",
+                            chat_id)
+                raid["active"] = False
+        if (not raid["active"]) and (raid["stats"] is not None):
+            if raid["users"] and \
+                    (now - raid["last_peak"] < CONST["T_RAID_RESULTS_WAIT"]):
+                continue
+            stats = raid["stats"]
+            raid["stats"] = None
+            raid["users"] = set()
+            msg_text = get_chat_msg(
+                chat_id, "RAID_MODE_END", stats["joins"], stats["solved"],
+                stats["kicked"], stats["banned"], stats["restricted"],
+                stats["left"])
+            rm_result_msg = get_chat_config(chat_id, "Rm_Result_Msg")
+            await tlg_bot_send_msg(bot, chat_id, msg_text, rm_result_msg)
+        if (not joins) and (not raid["active"]) and (raid["stats"] is None):
+            del Global.raid_chats[chat_id]
 
 
 ###############################################################################
 # Telegram Related Functions
 ###############################################################################
 
+def get_update_chat_id(active_polls, update):
+    '''
+    Get the ID of the chat an update belongs to, resolving the chat of
+    poll votes from the active captcha polls data (None if the update
+    doesn't belong to any known chat).
+    '''
+    chat_id = tlg_get_update_chat_id(update)
+    if (chat_id is None) and (update.poll_answer is not None):
+        poll_data = active_polls.get(update.poll_answer.poll_id, None)
+        if poll_data is not None:
+            chat_id = poll_data["chat_id"]
+    return chat_id
+
+
+def can_shed_update(update):
+    '''
+    Check if an update can be discarded when its chat has too many
+    pending updates: just normal messages from users that are not in a
+    captcha process (new members, captcha answers, polls votes, buttons
+    presses and commands are never discarded).
+    '''
+    msg = update.message
+    if msg is None:
+        msg = update.edited_message
+    if (msg is None) or (msg.from_user is None):
+        return False
+    if msg.new_chat_members or (msg.left_chat_member is not None):
+        return False
+    if (msg.text is not None) and msg.text.startswith("/"):
+        return False
+    return not is_unverified_user(msg.chat_id, msg.from_user.id)
+
+
 def tlg_autodelete_msg(message, time_delete_sec=CONST["T_DEL_MSG"]):
     '''
     Add a telegram message to be auto-delete in specified time.
@@ -310,31 +626,28 @@ def tlg_autodelete_msg(message, time_delete_sec=CONST["T_DEL_MSG"]):
         return False
     if not hasattr(message, "message_id"):
         return False
-    if not hasattr(message, "from_user"):
-        return False
-    if not hasattr(message.from_user, "id"):
-        return False
-    # Get sent message ID and calculate delete time
-    chat_id = message.chat_id
-    user_id = message.from_user.id
-    msg_id = message.message_id
-    _t0 = time()
-    # Add sent message data to to-delete messages list
-    sent_msg_data = OrderedDict(
-        [
-            ("Chat_id", None), ("User_id", None), ("Msg_id", None),
-            ("time", None), ("delete_time", None)
-        ]
-    )
-    sent_msg_data["Chat_id"] = chat_id
-    sent_msg_data["User_id"] = user_id
-    sent_msg_data["Msg_id"] = msg_id
-    sent_msg_data["time"] = _t0
-    sent_msg_data["delete_time"] = time_delete_sec
-    Global.to_delete_in_time_messages_list.append(sent_msg_data)
+    # Add sent message to to-delete messages list
+    delete_at = time() + time_delete_sec
+    auto_delete_schedule(message.chat_id, message.message_id, delete_at)
     return True
 
 
+def auto_delete_schedule(chat_id, msg_id, delete_at):
+    '''
+    Add a message to the to-delete messages priority queue (heap ordered
+    by delete time), and wake up the auto-delete messages coroutine if
+    it is now the first message to be deleted.
+    '''
+    entry = ScheduledDelete(
+        delete_at, next(Global.to_delete_in_time_messages_seq), chat_id,
+        msg_id)
+    heappush(Global.to_delete_in_time_messages_list, entry)
+    SessionData.msg_added(entry)
+    if Global.to_delete_in_time_messages_list[0] is entry:
+        if Global.auto_delete_wakeup is not None:
+            Global.auto_delete_wakeup.set()
+
+
 async def tlg_send_autodelete_msg(
         bot,
         chat_id,
@@ -375,6 +688,48 @@ async def tlg_bot_send_msg(bot, chat_id, msg_text, rm_result_msg,
     return sent_result
 
 
+async def send_result_msg(bot, chat_id, msg_text, rm_result_msg):
+    '''
+    Send a captcha result message. A result is sent right away, unless
+    another result of the chat has been sent in the last
+    T_RESULT_MSGS_WINDOW seconds. Then, the result messages of the chat
+    are collected until the window ends and sent together in a single
+    message (or as few as possible if they exceed the maximum message
+    length).
+    '''
+    if CONST["T_RESULT_MSGS_WINDOW"] <= 0:
+        await tlg_bot_send_msg(bot, chat_id, msg_text, rm_result_msg)
+        return
+    pending = Global.result_msgs.get(chat_id, None)
+    if pending is not None:
+        pending["texts"].append(msg_text)
+        return
+    # Send it and collect the next results of the chat in the window
+    pending = {"texts": [], "rm_result_msg": rm_result_msg}
+    Global.result_msgs[chat_id] = pending
+    pending["task"] = asyncio_create_task(send_result_msgs(bot, chat_id))
+    await tlg_bot_send_msg(bot, chat_id, msg_text, rm_result_msg)
+
+
+async def send_result_msgs(bot, chat_id):
+    '''
+    Send the captcha result messages of a chat collected in each window,
+    until a window ends without results (windows end right away if the
+    Bot exit is requested).
+    '''
+    pending = Global.result_msgs[chat_id]
+    while True:
+        await coroutine_sleep(None, CONST["T_RESULT_MSGS_WINDOW"])
+        texts = pending["texts"]
+        if not texts:
+            break
+        pending["texts"] = []
+        for msg_text in join_texts(texts, "\n\n", TLG_MAX_MSG_LEN):
+            await tlg_bot_send_msg(
+                bot, chat_id, msg_text, pending["rm_result_msg"])
+    del Global.result_msgs[chat_id]
+
+
 async def tlg_send_msg_type_chat(
         bot, chat_type, chat_id, msg_text, **kwargs_for_send_message):
     '''
@@ -413,16 +768,14 @@ async def is_admin_or_owner(bot, chat_id, user):
 
 def save_session():
     '''
-    Backup current execution data.
+    Write all pending session data changes and close the session
+    storage.
     '''
-    # Let's backup to file
-    data = {
-        "to_delete_in_time_messages_list":
-            Global.to_delete_in_time_messages_list,
-        "new_users": Global.new_users,
-        "connections": Global.connections
-    }
-    if not pickle_save(CONST["F_SESSION"], data):
+    saved = SessionData.flush(
+        Global.new_users, Global.connections,
+        Global.to_delete_in_time_messages_list)
+    SessionData.close()
+    if not saved:
         logger.error("Fail to save current session data")
         return False
     logger.info("Current session data saved")
@@ -432,41 +785,102 @@ def save_session():
 def restore_session():
     '''
     Load last execution data.
+    Note: Session data was stored in a pickle file by older versions,
+    if it exists, it is imported to the session database.
     '''
-    # Check if session file exists
-    if not file_exists(CONST["F_SESSION"]):
-        return False
-    # Get data from session file
-    last_session_data = pickle_restore(CONST["F_SESSION"])
-    if last_session_data is None:
-        logger.error("Fail to restore last session data")
+    if not SessionData.open():
         return False
+    # Get data from old session file or from session database
+    if file_exists(CONST["F_SESSION"]):
+        last_session_data = pickle_restore(CONST["F_SESSION"])
+        if last_session_data is None:
+            logger.error("Fail to restore last session data")
+            return False
+    else:
+        last_session_data = SessionData.load()
     # Load last session data to current RAM
     Global.connections = last_session_data["connections"]
     Global.new_users = last_session_data["new_users"]
-    Global.to_delete_in_time_messages_list = \
+    to_delete_in_time_messages_list = \
         last_session_data["to_delete_in_time_messages_list"]
     # Renew time to kick users
-    for chat_id in Global.new_users:
-        for user_id in Global.new_users[chat_id]:
+    # Note: old session file stored the users data as nested dicts
+    for chat_id, chat_users in Global.new_users.items():
+        for user_id, user_data in chat_users.items():
+            if isinstance(user_data, dict):
+                user_data = PendingVerification.from_data(user_data)
+                chat_users[user_id] = user_data
             # Some rand to avoid all requests sent at same time
-            _t0 = time() + random_randint(0, 10)
-            Global.new_users[chat_id][user_id]["join_data"]["join_time"] = _t0
-    # Renew time to remove messages
-    i = 0
-    while i < len(Global.to_delete_in_time_messages_list):
+            user_data.join_time = time() + random_randint(0, 10)
+            captcha_timeout_schedule(chat_id, user_id)
+    # Rebuild the to-delete queue, delaying the messages which delete
+    # time has passed while the Bot was stopped
+    # Note: older versions stored the messages data as dicts
+    Global.to_delete_in_time_messages_list = []
+    for sent_msg_data in to_delete_in_time_messages_list:
+        seq = next(Global.to_delete_in_time_messages_seq)
+        if isinstance(sent_msg_data, dict):
+            sent_msg_data = ScheduledDelete.from_data(sent_msg_data, seq)
         # Some rand to avoid all requests sent at same time
-        _t0 = time() + random_randint(0, 10)
-        Global.to_delete_in_time_messages_list[i]["time"] = _t0
-        i = i + 1
+        delete_at = max(
+            sent_msg_data.due_time, time() + random_randint(0, 10))
+        Global.to_delete_in_time_messages_list.append(
+            sent_msg_data._replace(due_time=delete_at, seq=seq))
+    heapify(Global.to_delete_in_time_messages_list)
+    # Store the renewed session data
+    SessionData.resync()
+    if not SessionData.flush(
+            Global.new_users, Global.connections,
+            Global.to_delete_in_time_messages_list):
+        logger.error("Fail to store restored session data")
+        return False
+    if file_exists(CONST["F_SESSION"]):
+        remove(CONST["F_SESSION"])
+        logger.info("Old session file imported to session database")
     logger.info("Last session data restored")
     return True
 
 
+async def session_flush():
+    '''
+    Periodically write the session data changes to the session storage.
+    The changes are serialized in the event loop and written by a
+    thread, so the database writes doesn't block other updates.
+    '''
+    while not Global.force_exit:
+        await coroutine_sleep(None, CONST["T_SESSION_FLUSH"])
+        batch = SessionData.take_changes(
+            Global.new_users, Global.connections,
+            Global.to_delete_in_time_messages_list)
+        if batch is not None:
+            await asyncio_to_thread(SessionData.write, batch)
+    logger.info("Session flush coroutine finished")
+
+
+async def coroutine_sleep(wakeup, sleep_time):
+    '''
+    Sleep a coroutine until the sleep time has passed, the provided
+    wakeup event is set (if any) or the Bot exit is requested.
+    '''
+    wait_tasks = []
+    if Global.exit_requested is not None:
+        wait_tasks.append(asyncio_create_task(Global.exit_requested.wait()))
+    if wakeup is not None:
+        wait_tasks.append(asyncio_create_task(wakeup.wait()))
+    if not wait_tasks:
+        await asyncio_sleep(sleep_time)
+        return
+    _, pending = await asyncio_wait(
+        wait_tasks, timeout=sleep_time,
+        return_when=ASYNCIO_FIRST_COMPLETED)
+    for task in pending:
+        task.cancel()
+
+
 def initialize_resources():
     '''
-    Initialize resources by populating files list with chats found
-    files.
+    Initialize resources (data files and directories, URL detection
+    regex and languages texts).
     '''
     # Remove old image captcha directory and create it again
     if path.exists(CONST["CAPTCHAS_DIR_IMG"]):
@@ -481,23 +895,17 @@ def initialize_resources():
     if CONST["BOT_PRIVATE"]:
         if not path.exists(CONST["F_ALLOWED_GROUPS"]):
             file_write(CONST["F_ALLOWED_GROUPS"], "")
+    # Open chats config database and import the chats config files
+    # (if it was not imported before)
+    if CONST["CHATS_CONFIG_BACKEND"] == "sqlite":
+        if not ConfigData.open():
+            logger.info("Exit.\n")
+            sys_exit(1)
+        ConfigData.import_json_tree(CONST["CHATS_DIR"], CONST["F_CONF"])
     # Create data directory if it does not exists
-    if not path.exists(CONST["CHATS_DIR"]):
+    # Note: chats configs are lazy loaded on first access of each chat
+    elif not path.exists(CONST["CHATS_DIR"]):
         makedirs(CONST["CHATS_DIR"])
-    else:
-        # If chats directory exists, check all subdirs names (chats ID)
-        files = listdir(CONST["CHATS_DIR"])
-        for f_chat_id in files:
-            # Populate config files list
-            file_path = f'{CONST["CHATS_DIR"]}/{f_chat_id}/{CONST["F_CONF"]}'
-            Global.files_config_list.append(
-                OrderedDict(
-                    [("ID", f_chat_id), ("File", TSjson(file_path))]))
-            # Create default configuration file if it does not exists
-            if not path.exists(file_path):
-                default_conf = get_default_config_data()
-                for key, value in default_conf.items():
-                    save_config_property(f_chat_id, key, value)
     # Load and generate URL detector regex from TLD list file
     load_urls_regex(f'{SCRIPT_PATH}/{CONST["F_TLDS"]}')
     # Load all languages texts
@@ -506,7 +914,11 @@ def initialize_resources():
 
 
 def load_urls_regex(file_path):
-    '''Load URL detection Regex from IANA TLD list text file.'''
+    '''
+    Load URL detection Regex from IANA TLD list text file. The TLDs
+    alternation is factorized as a prefix tree and the Regex is compiled
+    once, so messages checks doesn't need to go through all the TLDs.
+    '''
     tlds_str = ""
     list_file_lines = []
     try:
@@ -520,100 +932,243 @@ def load_urls_regex(file_path):
                 # IANA TLD list file)
                 if line[0] == "#":
                     continue
-                line = line.lower()
-                line = line.replace("\r", "")
-                line = line.replace("\n", "|")
+                line = line.lower().strip()
+                if line == "":
+                    continue
                 list_file_lines.append(line)
     except Exception:
         logger.error(format_exc())
         logger.error("Fail to open file \"%s\"", file_path)
     if len(list_file_lines) > 0:
-        # Remove last '|' from TLDs list item
-        num_tlds = len(list_file_lines)
-        last_tld = list_file_lines[num_tlds-1]
-        if last_tld[-1] == '|':
-            last_tld = last_tld[:-1]
-            list_file_lines[num_tlds-1] = last_tld
-        # Add all TLDs substring to the URL Regex
-        tlds_str = "".join(list_file_lines)
+        # Add all TLDs prefix tree alternation to the URL Regex
+        tlds_str = regex_trie(list_file_lines)
     CONST["REGEX_URLS"] = CONST["REGEX_URLS"].format(tlds_str)
+    Global.regex_urls = re.compile(CONST["REGEX_URLS"])
 
 
-def load_texts_languages():
+def load_language_file(lang_iso_code):
     '''
-    Load all texts from each language file.
+    Read the texts of a language file (exit if it can't be loaded).
     '''
-    # Initialize all languages to english texts by default, so if
-    # some language file miss some field, the english text is used
-    lang_file = f'{CONST["LANG_DIR"]}/{CONST["INIT_LANG"].lower()}.json'
-    json_init_lang_texts = TSjson(lang_file).read()
-    if (json_init_lang_texts is None) or (json_init_lang_texts == {}):
+    lang_file = f'{CONST["LANG_DIR"]}/{lang_iso_code.lower()}.json'
+    json_lang_texts = TSjson(lang_file).read()
+    if (json_lang_texts is None) or (json_lang_texts == {}):
         logger.error(
-            "Loading language \"%s\" from %s. Language file not "
-            "found or bad JSON syntax.",
-            CONST["INIT_LANG"].lower(), lang_file)
+            "Loading language \"%s\" from %s. "
+            "Language file not found or bad JSON syntax.",
+            lang_iso_code, lang_file)
         logger.info("Exit.\n")
         sys_exit(0)
-    for lang_iso_code, _ in TEXT.items():
-        TEXT[lang_iso_code] = json_init_lang_texts.copy()
-    # Load supported languages texts
-    for lang_iso_code, _ in TEXT.items():
-        lang_file = f'{CONST["LANG_DIR"]}/{lang_iso_code.lower()}.json'
-        json_lang_file = TSjson(lang_file)
-        json_lang_texts = json_lang_file.read()
-        if (json_lang_texts is None) or (json_lang_texts == {}):
-            logger.error(
-                "Loading language \"%s\" from %s. "
-                "Language file not found or bad JSON syntax.",
-                lang_iso_code, lang_file)
-            logger.info("Exit.\n")
-            sys_exit(0)
-        TEXT[lang_iso_code] = json_lang_texts
-    # Check if there is some missing text in any language
+    return json_lang_texts
+
+
+def load_texts_languages():
+    '''
+    Load all texts from each language file.
+    Each language file is read just once and its texts are merged over
+    the initial language (english) texts, so if some language file miss
+    some field, the english text is used. The texts of each language
+    are stored as a read-only mapping.
+    '''
+    init_lang = CONST["INIT_LANG"].upper()
+    json_init_lang_texts = load_language_file(init_lang)
     for lang_iso_code in TEXT:
-        lang_iso_code = lang_iso_code.lower()
-        lang_file = f'{CONST["LANG_DIR"]}/{lang_iso_code}.json'
-        json_lang_file = TSjson(lang_file)
-        json_lang_texts = json_lang_file.read()
+        if lang_iso_code == init_lang:
+            json_lang_texts = json_init_lang_texts
+        else:
+            json_lang_texts = load_language_file(lang_iso_code)
+        # Check if there is some missing text in the language
         for text in json_init_lang_texts:
             if text not in json_lang_texts:
                 logger.warning(
                     "Text \"%s\" missing from language file \"%s\".json",
-                    text, lang_iso_code)
+                    text, lang_iso_code.lower())
+        lang_texts = dict(json_init_lang_texts)
+        lang_texts.update(json_lang_texts)
+        TEXT[lang_iso_code] = MappingProxyType(lang_texts)
 
 
-def create_image_captcha(chat_id, file_name, difficult_level, captcha_mode):
+def img_captcha_executor_start():
+    '''
+    Start the pool of worker processes for image captchas generation.
+    '''
+    num_workers = CONST["IMG_CAPTCHA_WORKERS"]
+    if num_workers <= 0:
+        logger.info("Image captcha workers disabled, using threads.")
+        return
+    if Global.img_captcha_executor_lock is None:
+        Global.img_captcha_executor_lock = AsyncioLock()
+    Global.img_captcha_executor_gen = Global.img_captcha_executor_gen + 1
+    # Note: Spawn processes instead of fork to don't clone the Bot
+    # running threads and event loop into the workers (each worker
+    # imports this script again, on each pool start, but without
+    # creating the Bot objects)
+    Global.img_captcha_executor = ProcessPoolExecutor(
+        max_workers=num_workers,
+        mp_context=multiprocessing_get_context("spawn"),
+        initializer=img_captcha_worker_init)
+    logger.info("Image captcha workers started (%d).", num_workers)
+
+
+def img_captcha_executor_stop(wait=True):
+    '''
+    Stop the pool of worker processes for image captchas generation
+    (waiting or not for the worker processes to finish).
+    '''
+    if Global.img_captcha_executor is None:
+        return
+    Global.img_captcha_executor.shutdown(wait=wait, cancel_futures=True)
+    Global.img_captcha_executor = None
+
+
+async def create_image_captcha(chat_id, file_name, difficult_level,
+                               captcha_mode):
     '''
     Generate an image captcha from pseudo numbers.
+    The image is rendered by a worker process (or a thread, if workers
+    are disabled), so it doesn't block the handling of other updates.
+    '''
+    img_file_path = None
+    if not CONST["IMG_CAPTCHA_IN_MEMORY"]:
+        img_file_path = \
+            f'{CONST["CAPTCHAS_DIR_IMG"]}/{chat_id}/{file_name}.png'
+    loop = asyncio_get_running_loop()
+    executor_gen = Global.img_captcha_executor_gen
+    try:
+        return await loop.run_in_executor(
+            Global.img_captcha_executor, gen_image_captcha,
+            img_file_path, difficult_level, captcha_mode)
+    except BrokenProcessPool:
+        # Some worker process has died, restart the pool (just once for
+        # all the requests that were using the broken pool)
+        async with Global.img_captcha_executor_lock:
+            if executor_gen == Global.img_captcha_executor_gen:
+                logger.error(
+                    "Image captcha workers pool broken, restarting it...")
+                img_captcha_executor_stop(wait=False)
+                img_captcha_executor_start()
+    return await loop.run_in_executor(
+        Global.img_captcha_executor, gen_image_captcha,
+        img_file_path, difficult_level, captcha_mode)
+
+
+def open_image_captcha(captcha):
+    '''
+    Get a binary file object to read the image of a generated image
+    captcha (in memory PNG data or PNG file).
+    '''
+    if isinstance(captcha["image"], bytes):
+        return BytesIO(captcha["image"])
+    return open(captcha["image"], "rb")
+
+
+def remove_image_captcha(captcha):
+    '''
+    Remove the image file of a generated image captcha (if any).
+    '''
+    if isinstance(captcha["image"], bytes):
+        return
+    if path.exists(captcha["image"]):
+        remove(captcha["image"])
+
+
+def img_captcha_pool_key(captcha_mode, difficult_level):
+    '''
+    Get the image captchas pool key of a captcha mode and difficulty
+    (math captchas doesn't depend on the difficulty level).
     '''
-    # If it doesn't exists, create captchas folder to store them
-    img_dir_path = f'{CONST["CAPTCHAS_DIR_IMG"]}/{chat_id}'
-    img_file_path = f'{img_dir_path}/{file_name}.png'
-    if not path.exists(img_dir_path):
-        makedirs(img_dir_path)
-    else:
-        # If the captcha file exists remove it
-        if path.exists(img_file_path):
-            remove(img_file_path)
-    # Generate and save the captcha with a random background
-    # mono-color or multi-color
-    captcha_result = {
-        "image": img_file_path,
-        "characters": "",
-        "equation_str": "",
-        "equation_result": ""
-    }
     if captcha_mode == "math":
-        captcha = CaptchaGenImage.gen_math_captcha_image(
-            2, bool(random_randint(0, 1)))
-        captcha_result["equation_str"] = captcha["equation_str"]
-        captcha_result["equation_result"] = captcha["equation_result"]
-    else:
-        captcha = CaptchaGenImage.gen_captcha_image(
-            difficult_level, captcha_mode, bool(random_randint(0, 1)))
-        captcha_result["characters"] = captcha["characters"]
-    captcha["image"].save(img_file_path, "png")
-    return captcha_result
+        return ("math", 0)
+    return (captcha_mode, difficult_level)
+
+
+async def img_captcha_pool_refill(key):
+    '''
+    Generate image captchas of a captcha mode and difficulty until its
+    pool is full.
+    '''
+    captcha_mode, difficult_level = key
+    pool = Global.img_captchas_pool.setdefault(key, deque())
+    num_workers = max(1, CONST["IMG_CAPTCHA_WORKERS"])
+    try:
+        while not Global.force_exit:
+            num_missing = CONST["IMG_CAPTCHA_POOL_SIZE"] - len(pool)
+            if num_missing <= 0:
+                break
+            captchas = await asyncio_gather(*[
+                create_image_captcha(
+                    "pool", f"{captcha_mode}_{difficult_level}_"
+                    f"{next(Global.img_captchas_pool_seq)}",
+                    difficult_level, captcha_mode)
+                for _ in range(min(num_missing, num_workers))
+            ])
+            pool.extend(captchas)
+    except Exception:
+        logger.error(format_exc())
+        logger.error("Fail to refill image captchas pool %s", key)
+    finally:
+        Global.img_captchas_pool_tasks.pop(key, None)
+
+
+def img_captcha_pool_request_refill(key):
+    '''
+    Launch the refill of an image captchas pool if it is under the low
+    watermark and it is not already being refilled.
+    '''
+    if key in Global.img_captchas_pool_tasks:
+        return
+    pool = Global.img_captchas_pool.get(key)
+    if (pool is not None) and (len(pool) > CONST["IMG_CAPTCHA_POOL_LOW"]):
+        return
+    Global.img_captchas_pool_tasks[key] = \
+        asyncio_create_task(img_captcha_pool_refill(key))
+
+
+def img_captcha_pool_start():
+    '''
+    Launch the initial fill of all image captcha modes and difficulty
+    levels pools.
+    '''
+    if CONST["IMG_CAPTCHA_POOL_SIZE"] <= 0:
+        return
+    for captcha_mode in ["nums", "hex", "ascii"]:
+        for difficult_level in range(1, 6):
+            img_captcha_pool_request_refill(
+                img_captcha_pool_key(captcha_mode, difficult_level))
+    img_captcha_pool_request_refill(img_captcha_pool_key("math", 0))
+    logger.info("Image captchas pools filling started.")
+
+
+async def img_captcha_pool_stop():
+    '''
+    Stop the image captchas pools refill tasks.
+    '''
+    tasks = list(Global.img_captchas_pool_tasks.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio_gather(*tasks, return_exceptions=True)
+
+
+async def get_image_captcha(chat_id, file_name, difficult_level,
+                            captcha_mode):
+    '''
+    Get an image captcha from the pre-generated captchas pool of the
+    captcha mode and difficulty (or generate it if the pool is empty).
+    '''
+    if CONST["IMG_CAPTCHA_POOL_SIZE"] <= 0:
+        return await create_image_captcha(
+            chat_id, file_name, difficult_level, captcha_mode)
+    key = img_captcha_pool_key(captcha_mode, difficult_level)
+    pool = Global.img_captchas_pool.get(key)
+    captcha = None
+    if pool:
+        captcha = pool.popleft()
+    img_captcha_pool_request_refill(key)
+    if captcha is None:
+        logger.warning("Image captchas pool %s empty", key)
+        captcha = await create_image_captcha(
+            chat_id, file_name, difficult_level, captcha_mode)
+    return captcha
 
 
 def num_config_poll_options(poll_options):
@@ -641,15 +1196,49 @@ def is_user_in_ignored_list(chat_id, user):
     return False
 
 
+def get_list_file(file_path):
+    '''
+    Get the set of elements from a global list text file (allowed users,
+    allowed groups or banned groups). The elements are kept in memory
+    and the file is just read again when it has been modified (file
+    modification time is checked at most each T_LIST_FILES_CHECK).
+    Note: the elements are normalized as lowercase strings.
+    '''
+    _t0 = time()
+    list_file = Global.list_files.get(file_path, None)
+    if (list_file is not None) and (_t0 < list_file["check_time"]):
+        return list_file["items"]
+    try:
+        mtime = stat(file_path).st_mtime
+    except OSError:
+        mtime = None
+    if (list_file is None) or (mtime != list_file["mtime"]):
+        items = set()
+        if mtime is not None:
+            items = {line.strip().lower() for line in file_read(file_path)}
+        list_file = {"mtime": mtime, "items": items}
+        Global.list_files[file_path] = list_file
+    list_file["check_time"] = _t0 + CONST["T_LIST_FILES_CHECK"]
+    return list_file["items"]
+
+
+def reload_list_file(file_path):
+    '''
+    Discard the in-memory elements of a global list text file, so it is
+    read again in next access (i.e. after the file has been modified).
+    '''
+    Global.list_files.pop(file_path, None)
+
+
 def is_user_in_allowed_list(user):
     '''
     Check if user is in global allowed list.
     '''
-    l_white_users = file_read(CONST["F_ALLOWED_USERS"])
-    if user.id in l_white_users:
+    l_white_users = get_list_file(CONST["F_ALLOWED_USERS"])
+    if str(user.id) in l_white_users:
         return True
     if user.username:
-        user_alias = f"@{user.username}"
+        user_alias = f"@{user.username}".lower()
         if user_alias in l_white_users:
             return True
     return False
@@ -662,7 +1251,7 @@ def is_group_in_allowed_list(chat_id):
     # True if Bot is Public
     if not CONST["BOT_PRIVATE"]:
         return True
-    l_allowed_groups = file_read(CONST["F_ALLOWED_GROUPS"])
+    l_allowed_groups = get_list_file(CONST["F_ALLOWED_GROUPS"])
     if str(chat_id) in l_allowed_groups:
         return True
     return False
@@ -672,7 +1261,7 @@ def is_group_in_banned_list(chat_id):
     '''
     Check if group is in banned list.
     '''
-    l_banned_groups = file_read(CONST["F_BAN_GROUPS"])
+    l_banned_groups = get_list_file(CONST["F_BAN_GROUPS"])
     if str(chat_id) in l_banned_groups:
         return True
     return False
@@ -729,12 +1318,36 @@ async def delete_msg(bot, chat_id, msg_id):
     return delete_result
 
 
+async def delete_msgs(bot, chat_id, msg_ids):
+    '''Delete a list of Telegram Messages of a chat.'''
+    delete_result = await tlg_delete_msgs(bot, chat_id, msg_ids)
+    num_failed = len(delete_result["failed"])
+    num_deleted = delete_result["num_msgs"] - num_failed
+    if num_deleted > 0:
+        logger.info("[%s] Messages deleted (%d)", chat_id, num_deleted)
+    if num_failed > 0:
+        logger.info("[%s] Fail to delete messages %s", chat_id,
+                    list(delete_result["failed"]))
+    return delete_result
+
+
 def is_unverified_user(chat_id, user_id):
     '''Check if a user shall complete the captcha process.'''
     return (chat_id in Global.new_users) and \
            (user_id in Global.new_users[chat_id])
 
 
+def is_pending_user_data(chat_id, user_id, user_data):
+    '''
+    Check if a captcha process data is still the pending one of a user
+    (the user has not complete the captcha, left, join again or has been
+    kicked meanwhile).
+    '''
+    if Global.new_users.get(chat_id, {}).get(user_id, None) is not user_data:
+        return False
+    return not user_data.kicked_ban
+
+
 def is_admin_call(text: str) -> bool:
     '''Check if a text is a specific keyword to call admins.'''
     if not text or not isinstance(text, str):
@@ -844,22 +1457,19 @@ async def captcha_fail_member_mute(bot, chat_id, user_id, user_name):
     Restrict the user to deny send any kind of message for 24h.
     '''
     lang = get_chat_config(chat_id, "Language")
-    user_name = Global.new_users[chat_id][user_id]["join_data"]["user_name"]
+    user_name = Global.new_users[chat_id][user_id].user_name
     mute_until_24h = get_unix_epoch() + CONST["T_SECONDS_IN_A_DAY"]
     logger.info("[%s] Captcha Fail - Mute - %s (%s)",
                 chat_id, user_name, user_id)
     success = await restrict_user_mute(bot, chat_id, user_id, mute_until_24h)
     if success:
-        msg_text = TEXT[lang]["CAPTCHA_FAIL_MUTE"].format(user_name)
-        if lang != "EN":
-            bilang = get_chat_config(chat_id, "BiLang")
-            if bilang:
-                en_text = TEXT["EN"]["CAPTCHA_FAIL_MUTE"].format(user_name)
-                msg_text = f"{msg_text}\n\n{en_text}"
+        if raid_mode_result(chat_id, user_id, "restricted"):
+            return
+        msg_text = get_chat_msg(chat_id, "CAPTCHA_FAIL_MUTE", user_name)
     else:
         msg_text = TEXT[lang]["CAPTCHA_FAIL_CANT_RESTRICT"].format(user_name)
     rm_result_msg = get_chat_config(chat_id, "Rm_Result_Msg")
-    await tlg_bot_send_msg(bot, chat_id, msg_text, rm_result_msg)
+    await send_result_msg(bot, chat_id, msg_text, rm_result_msg)
 
 
 async def captcha_fail_member_no_media(bot, chat_id, user_id, user_name):
@@ -873,16 +1483,13 @@ async def captcha_fail_member_no_media(bot, chat_id, user_id, user_name):
                 chat_id, user_name, user_id)
     success = await restrict_user_media(bot, chat_id, user_id, mute_until_24h)
     if success:
-        msg_text = TEXT[lang]["CAPTCHA_FAIL_NO_MEDIA"].format(user_name)
-        if lang != "EN":
-            bilang = get_chat_config(chat_id, "BiLang")
-            if bilang:
-                en_text = TEXT["EN"]["CAPTCHA_FAIL_NO_MEDIA"].format(user_name)
-                msg_text = f"{msg_text}\n\n{en_text}"
+        if raid_mode_result(chat_id, user_id, "restricted"):
+            return
+        msg_text = get_chat_msg(chat_id, "CAPTCHA_FAIL_NO_MEDIA", user_name)
     else:
         msg_text = TEXT[lang]["CAPTCHA_FAIL_CANT_RESTRICT"].format(user_name)
     rm_result_msg = get_chat_config(chat_id, "Rm_Result_Msg")
-    await tlg_bot_send_msg(bot, chat_id, msg_text, rm_result_msg)
+    await send_result_msg(bot, chat_id, msg_text, rm_result_msg)
 
 
 async def captcha_fail_member_kick(bot, chat_id, user_id, user_name):
@@ -899,7 +1506,7 @@ async def captcha_fail_member_kick(bot, chat_id, user_id, user_name):
     if captcha_mode == "poll":
         max_join_retries = CONST["MAX_FAIL_BAN_POLL"]
     join_retries = \
-        Global.new_users[chat_id][user_id]["join_data"]["join_retries"]
+        Global.new_users[chat_id][user_id].join_retries
     logger.info("[%s] %s join_retries: %d", chat_id, user_id, join_retries)
     # Kick if user has fail to solve the captcha less than
     # "max_join_retries"
@@ -911,22 +1518,21 @@ async def captcha_fail_member_kick(bot, chat_id, user_id, user_name):
         if kick_result["error"] == "":
             # Kick success
             join_retries = join_retries + 1
-            msg_text = TEXT[lang]["CAPTCHA_FAIL_KICK"].format(user_name)
-            if lang != "EN":
-                bilang = get_chat_config(chat_id, "BiLang")
-                if bilang:
-                    en_text = TEXT["EN"]["CAPTCHA_FAIL_KICK"].format(user_name)
-                    msg_text = f"{msg_text}\n\n{en_text}"
-            await tlg_bot_send_msg(bot, chat_id, msg_text, rm_result_msg)
+            if not raid_mode_result(chat_id, user_id, "kicked"):
+                msg_text = get_chat_msg(
+                    chat_id, "CAPTCHA_FAIL_KICK", user_name)
+                await send_result_msg(bot, chat_id, msg_text, rm_result_msg)
         else:
             # Kick fail
             logger.info("[%s] Unable to kick", chat_id)
             if ((kick_result["error"] == "The user has left the group") or
                     (kick_result["error"] == "The user was already kicked")):
                 # The user is not in the chat
-                msg_text = TEXT[lang]["NEW_USER_KICK_NOT_IN_CHAT"].format(
-                    user_name)
-                await tlg_bot_send_msg(bot, chat_id, msg_text, rm_result_msg)
+                if not raid_mode_result(chat_id, user_id, "left"):
+                    msg_text = TEXT[lang]["NEW_USER_KICK_NOT_IN_CHAT"].format(
+                        user_name)
+                    await send_result_msg(
+                        bot, chat_id, msg_text, rm_result_msg)
             elif kick_result["error"] == \
                     "Not enough rights to restrict/unrestrict chat member":
                 # Bot has no privileges to kick
@@ -937,7 +1543,7 @@ async def captcha_fail_member_kick(bot, chat_id, user_id, user_name):
             else:
                 # For other reason, the Bot can't ban
                 msg_text = TEXT[lang]["BOT_CANT_KICK"].format(user_name)
-                await tlg_bot_send_msg(bot, chat_id, msg_text, rm_result_msg)
+                await send_result_msg(bot, chat_id, msg_text, rm_result_msg)
     # Ban if user has join "max_join_retries" times without solving
     # the captcha
     else:
@@ -950,21 +1556,18 @@ async def captcha_fail_member_kick(bot, chat_id, user_id, user_name):
         else:
             ban_until_date = None
         ban_result = await tlg_ban_user(bot, chat_id, user_id, until_date=ban_until_date)
+        raid_result = "banned"
         if ban_result["error"] == "":
             # Ban success
             banned = True
-            msg_text = TEXT[lang]["CAPTCHA_FAIL_BAN"].format(
-                user_name, max_join_retries)
-            if lang != "EN":
-                bilang = get_chat_config(chat_id, "BiLang")
-                if bilang:
-                    en_text = TEXT["EN"]["CAPTCHA_FAIL_BAN"].format(
-                        user_name, max_join_retries)
-                    msg_text = f"{msg_text}\n\n{en_text}"
+            msg_text = get_chat_msg(
+                chat_id, "CAPTCHA_FAIL_BAN", user_name, max_join_retries)
         else:
             # Ban fail
+            raid_result = None
             if ban_result["error"] == "User not found":
                 # The user is not in the chat
+                raid_result = "left"
                 msg_text = TEXT[lang]["NEW_USER_BAN_NOT_IN_CHAT"].format(
                     user_name, max_join_retries)
             elif ban_result["error"] \
@@ -978,18 +1581,24 @@ async def captcha_fail_member_kick(bot, chat_id, user_id, user_name):
                     user_name, max_join_retries)
         # Send ban notify message
         logger.info("[%s] %s", chat_id, msg_text)
-        if rm_result_msg:
-            await tlg_send_autodelete_msg(bot, chat_id, msg_text)
-        else:
-            await tlg_send_msg(bot, chat_id, msg_text)
+        # (counted for the raid summary instead, if the chat is in raid)
+        if (raid_result is None) or \
+                (not raid_mode_result(chat_id, user_id, raid_result)):
+            if rm_result_msg:
+                await tlg_send_autodelete_msg(bot, chat_id, msg_text)
+            else:
+                await tlg_send_msg(bot, chat_id, msg_text)
     # Update user info (join_retries & kick_ban)
     try:
-        Global.new_users[chat_id][user_id]["join_data"]["kicked_ban"] = True
-        Global.new_users[chat_id][user_id]["join_data"]["join_retries"] = \
-            join_retries
-        # Delete user join info if ban was success
+        Global.new_users[chat_id][user_id].kicked_ban = True
+        Global.new_users[chat_id][user_id].join_retries = join_retries
+        SessionData.user_changed(chat_id, user_id)
+        # Delete user join info if ban was success, or set the time to
+        # forget the kicked user otherwise
         if banned:
-            del Global.new_users[chat_id][user_id]
+            remove_join_user_data(chat_id, user_id)
+        else:
+            captcha_timeout_schedule(chat_id, user_id)
     except KeyError:
         logger.warning(
             "[%s] %s (%d) not in new_users list (already solve captcha)",
@@ -1001,7 +1610,7 @@ async def captcha_fail_member(bot, chat_id, user_id):
     Restrict (Kick, Ban, mute, etc) a new member that has fail to solve
     the captcha.
     '''
-    user_name = Global.new_users[chat_id][user_id]["join_data"]["user_name"]
+    user_name = Global.new_users[chat_id][user_id].user_name
     restriction = get_chat_config(chat_id, "Fail_Restriction")
     if restriction == CMD["RESTRICTION"]["MUTE"]:
         await captcha_fail_member_mute(bot, chat_id, user_id, user_name)
@@ -1012,14 +1621,15 @@ async def captcha_fail_member(bot, chat_id, user_id):
     # Remove join messages
     try:
         logger.info("[%s] Removing msgs from user %s...", chat_id, user_name)
-        join_msg = Global.new_users[chat_id][user_id]["join_msg"]
+        join_msg = Global.new_users[chat_id][user_id].join_msg
+        msgs_to_rm = list(Global.new_users[chat_id][user_id].msg_to_rm)
         if join_msg is not None:
-            await delete_msg(bot, chat_id, join_msg)
-        for msg in Global.new_users[chat_id][user_id]["msg_to_rm"]:
-            await delete_msg(bot, chat_id, msg)
-        Global.new_users[chat_id][user_id]["msg_to_rm"].clear()
+            msgs_to_rm.insert(0, join_msg)
+        await delete_msgs(bot, chat_id, msgs_to_rm)
+        Global.new_users[chat_id][user_id].clear_msgs_to_rm()
+        SessionData.user_changed(chat_id, user_id)
         if restriction != CMD["RESTRICTION"]["KICK"]:
-            del Global.new_users[chat_id][user_id]
+            remove_join_user_data(chat_id, user_id)
     except KeyError:
         logger.warning(
             "[%s] %s (%d) not in new_users list (already solve captcha)",
@@ -1057,53 +1667,63 @@ def add_join_user_data(chat_id, join_user_id, join_user_name, captcha_mode,
     Add new join member captcha process data to global list of new
     users that needs to solve the captcha challenge.
     '''
-    # Default user join data
-    join_data = {
-        "user_name": join_user_name,
-        "captcha_code": captcha_code,
-        "captcha_mode": captcha_mode,
-        "join_time": time(),
-        "captcha_timeout": captcha_timeout,
-        "join_retries": 1,
-        "kicked_ban": False
-    }
-    # Create dict keys for new user
-    if chat_id not in Global.new_users:
-        Global.new_users[chat_id] = {}
-    if join_user_id not in Global.new_users[chat_id]:
-        Global.new_users[chat_id][join_user_id] = {}
-    if "join_data" not in Global.new_users[chat_id][join_user_id]:
-        Global.new_users[chat_id][join_user_id]["join_data"] = {}
-    if "join_msg" not in Global.new_users[chat_id][join_user_id]:
-        Global.new_users[chat_id][join_user_id]["join_msg"] = None
-    if "msg_to_rm" not in Global.new_users[chat_id][join_user_id]:
-        Global.new_users[chat_id][join_user_id]["msg_to_rm"] = []
+    chat_users = Global.new_users.setdefault(chat_id, {})
+    user_data = PendingVerification(
+        join_user_name, captcha_code, captcha_mode, captcha_timeout,
+        join_msg=join_msg_id, msg_to_rm=list_msg_to_rm)
     # Check if this user was before in the chat without solve the
-    # captcha and restore previous join_retries
-    if len(Global.new_users[chat_id][join_user_id]["join_data"]) != 0:
-        user_join_data = \
-            Global.new_users[chat_id][join_user_id]["join_data"]
-        join_data["join_retries"] = user_join_data["join_retries"]
-    # Add new user join data and messages to be removed
-    Global.new_users[chat_id][join_user_id]["join_data"] = join_data
-    Global.new_users[chat_id][join_user_id]["join_msg"] = join_msg_id
-    for msg_id in list_msg_to_rm:
-        Global.new_users[chat_id][join_user_id]["msg_to_rm"].append(msg_id)
+    # captcha and restore previous join_retries and messages to remove
+    prev_user_data = chat_users.get(join_user_id, None)
+    if prev_user_data is not None:
+        user_data.join_retries = prev_user_data.join_retries
+        user_data.msg_to_rm = prev_user_data.msg_to_rm + user_data.msg_to_rm
+    chat_users[join_user_id] = user_data
+    SessionData.user_changed(chat_id, join_user_id)
+    # Set the time to kick/ban the user if captcha is not solved
+    captcha_timeout_schedule(chat_id, join_user_id)
+
+
+def remove_join_user_data(chat_id, user_id):
+    '''
+    Remove a member from global list of new users that needs to solve
+    the captcha challenge, and cancel its captcha timeout.
+    '''
+    del Global.new_users[chat_id][user_id]
+    Global.captcha_deadlines.pop((chat_id, user_id), None)
+    SessionData.user_changed(chat_id, user_id)
+
+
+def captcha_timeout_schedule(chat_id, user_id):
+    '''
+    Set (or update) the captcha process deadline of a new user from its
+    join data (time to kick/ban the user if the captcha has not been
+    solved, or time to forget an already kicked user), and wake up the
+    captcha timeout coroutine if it is now the first deadline to come.
+    Note: previous deadlines of the user are just discarded from the
+    queue when reached, so update or cancel a deadline is O(1).
+    '''
+    user_data = Global.new_users[chat_id][user_id]
+    deadline = user_data.join_time + user_data.captcha_timeout
+    if user_data.kicked_ban:
+        deadline = deadline + CONST["T_FORGET_KICKED_USER"]
+    Global.captcha_deadlines[(chat_id, user_id)] = deadline
+    entry = (deadline, chat_id, user_id)
+    heappush(Global.captcha_deadlines_list, entry)
+    if Global.captcha_deadlines_list[0] is entry:
+        if Global.captcha_timeout_wakeup is not None:
+            Global.captcha_timeout_wakeup.set()
 
 
 async def send_captcha_button(update, context, captcha_mode, captcha_timeout,
-                              chat_id, chat_title, lang, bilang, join_user_id,
-                              join_user_name, timeout_str):
+                              chat_id, chat_title, lang, join_user_id,
+                              join_user_name, timeout_str, raid_muted=False):
     '''Send button captcha challenge.'''
     send_success = False
     list_msg_to_rm = list()
     bot = context.bot
-    challenge_text = TEXT[lang]["NEW_USER_BUTTON_MODE"].format(
+    challenge_text = get_chat_msg(
+        chat_id, "NEW_USER_BUTTON_MODE",
         join_user_name, chat_title, timeout_str)
-    if bilang:
-        en_text = TEXT["EN"]["NEW_USER_BUTTON_MODE"].format(
-            join_user_name, chat_title, timeout_str)
-        challenge_text = f"{challenge_text}\n\n{en_text}"
     keyboard = [[
         InlineKeyboardButton(
                 TEXT[lang]["PASS_BTN_TEXT"],
@@ -1114,7 +1734,8 @@ async def send_captcha_button(update, context, captcha_mode, captcha_timeout,
     logger.info("[%s] Sending captcha message to %s (%d): [button]",
                 chat_id, join_user_name, join_user_id)
     sent_result = await tlg_send_msg(
-        bot, chat_id, challenge_text, reply_markup=reply_markup)
+        bot, chat_id, challenge_text, reply_markup=reply_markup,
+        priority=TLG_PRIORITY_HIGH)
     if sent_result["msg"]:
         send_success = True
         join_msg_id = None
@@ -1126,13 +1747,15 @@ async def send_captcha_button(update, context, captcha_mode, captcha_timeout,
                            captcha_code, captcha_timeout, join_msg_id,
                            list_msg_to_rm)
         # Restrict user to send any kind of message until captcha completion
-        await restrict_user_mute(bot, chat_id, join_user_id)
+        # (unless the user has already been muted on a raid join)
+        if not raid_muted:
+            await restrict_user_mute(bot, chat_id, join_user_id)
     return send_success
 
 
 async def send_captcha_poll(update, context, captcha_mode, captcha_timeout,
-                            chat_id, chat_title, lang, bilang, join_user_id,
-                            join_user_name, timeout_str):
+                            chat_id, chat_title, lang, join_user_id,
+                            join_user_name, timeout_str, raid_muted=False):
     '''Send custom poll captcha challenge.'''
     send_success = False
     list_msg_to_rm = list()
@@ -1152,21 +1775,18 @@ async def send_captcha_poll(update, context, captcha_mode, captcha_timeout,
     # Send request to solve the poll text message
     logger.info("[%s] Sending captcha message to %s (%d): [poll]",
                 chat_id, join_user_name, join_user_id)
-    poll_request_msg_text = TEXT[lang]["POLL_NEW_USER"].format(
-        join_user_name, chat_title, timeout_str)
-    if bilang:
-        en_text = TEXT["EN"]["POLL_NEW_USER"].format(
-            join_user_name, chat_title, timeout_str)
-        poll_request_msg_text = f"{poll_request_msg_text}\n\n{en_text}"
+    poll_request_msg_text = get_chat_msg(
+        chat_id, "POLL_NEW_USER", join_user_name, chat_title, timeout_str)
     sent_msg_id = await tlg_send_autodelete_msg(
-        bot, chat_id, poll_request_msg_text, captcha_timeout)
+        bot, chat_id, poll_request_msg_text, captcha_timeout,
+        priority=TLG_PRIORITY_HIGH)
     if sent_msg_id:
         list_msg_to_rm.append(sent_msg_id)
     # Send the Poll
     send_result = await tlg_send_poll(
         bot, chat_id, poll_question, poll_options,
         poll_correct_option-1, captcha_timeout, False, Poll.QUIZ,
-        read_timeout=20)
+        priority=TLG_PRIORITY_HIGH, read_timeout=20)
     if send_result["msg"]:
         send_success = True
         list_msg_to_rm.append(send_result["msg"].message_id)
@@ -1193,19 +1813,21 @@ async def send_captcha_poll(update, context, captcha_mode, captcha_timeout,
                            captcha_mode, captcha_code, captcha_timeout,
                            join_msg_id, list_msg_to_rm)
         # Restrict user to send any message until captcha completion
-        await restrict_user_mute(bot, chat_id, join_user_id)
+        # (unless the user has already been muted on a raid join)
+        if not raid_muted:
+            await restrict_user_mute(bot, chat_id, join_user_id)
     return send_success
 
 
 async def send_captcha_image(update, context, captcha_mode, captcha_timeout,
-                             chat_id, chat_title, lang, bilang, join_user_id,
+                             chat_id, chat_title, lang, join_user_id,
                              join_user_name, timeout_str):
     '''Send image captcha challenge.'''
     send_success = False
     list_msg_to_rm = list()
     bot = context.bot
     captcha_level = get_chat_config(chat_id, "Captcha_Difficulty_Level")
-    captcha = create_image_captcha(
+    captcha = await get_image_captcha(
         chat_id, join_user_id, captcha_level, captcha_mode)
     if captcha_mode == "math":
         captcha_code = captcha["equation_result"]
@@ -1213,24 +1835,18 @@ async def send_captcha_image(update, context, captcha_mode, captcha_timeout,
                     chat_id, join_user_name, join_user_id,
                     captcha["equation_str"], captcha["equation_result"])
         # Note: Img caption must be <= 1024 chars
-        img_caption = TEXT[lang]["NEW_USER_MATH_CAPTION"].format(
+        img_caption = get_chat_msg(
+            chat_id, "NEW_USER_MATH_CAPTION",
             join_user_name, chat_title, timeout_str)
-        if bilang:
-            en_text = TEXT["EN"]["NEW_USER_MATH_CAPTION"].format(
-                join_user_name, chat_title, timeout_str)
-            img_caption = f"{img_caption}\n\n{en_text}"
         img_caption = img_caption[:1024]
     else:
         captcha_code = captcha["characters"]
         logger.info("[%s] Sending captcha message to %s (%d): %s [img]",
                     chat_id, join_user_name, join_user_id, captcha_code)
         # Note: Img caption must be <= 1024 chars
-        img_caption = TEXT[lang]["NEW_USER_IMG_CAPTION"].format(
+        img_caption = get_chat_msg(
+            chat_id, "NEW_USER_IMG_CAPTION",
             join_user_name, chat_title, timeout_str)
-        if bilang:
-            en_text = TEXT["EN"]["NEW_USER_IMG_CAPTION"].format(
-                join_user_name, chat_title, timeout_str)
-            img_caption = f"{img_caption}\n\n{en_text}"
         img_caption = img_caption[:1024]
     # Prepare inline keyboard button to let user request another
     # captcha
@@ -1245,10 +1861,11 @@ async def send_captcha_image(update, context, captcha_mode, captcha_timeout,
     sent_result = {}
     sent_result["msg"] = None
     try:
-        with open(captcha["image"], "rb") as file_image:
+        with open_image_captcha(captcha) as file_image:
             sent_result = await tlg_send_image(
                 bot, chat_id, file_image, img_caption,
-                reply_markup=reply_markup, read_timeout=20)
+                reply_markup=reply_markup, priority=TLG_PRIORITY_HIGH,
+                read_timeout=20)
     except Exception:
         logger.error(format_exc())
         logger.error("Fail to send image to Telegram")
@@ -1266,13 +1883,74 @@ async def send_captcha_image(update, context, captcha_mode, captcha_timeout,
         # Restrict user to send any non-text message
         await restrict_user_media(bot, chat_id, join_user_id)
     # Remove sent captcha image file from file system
-    if path.exists(captcha["image"]):
-        remove(captcha["image"])
+    remove_image_captcha(captcha)
     return send_success
 
 
+def set_video_captcha_file_id(file_path, msg):
+    '''
+    Store the Telegram file_id of an uploaded video captcha file, to
+    send it again without uploading it.
+    '''
+    if (msg is None) or (msg.video is None):
+        return
+    file_path = str(file_path)
+    try:
+        file_mtime = stat(file_path).st_mtime_ns
+    except OSError:
+        return
+    Global.video_captchas_file_id[file_path] = \
+        (file_mtime, msg.video.file_id)
+    # Forget video captchas rotated out from the captchas pool
+    if len(Global.video_captchas_file_id) > CONST["MAX_NUM_VIDEO_CAPTCHAS"]:
+        for cached_file_path in list(Global.video_captchas_file_id):
+            if not path.exists(cached_file_path):
+                del Global.video_captchas_file_id[cached_file_path]
+
+
+async def get_video_captcha_file_id(bot, file_path):
+    '''
+    Get the Telegram file_id of an uploaded video captcha file (None if
+    it has not been uploaded or the file has been regenerated).
+    If a video captchas cache chat is configured and the file has not
+    been uploaded, upload it to that chat to get the file_id.
+    '''
+    file_path = str(file_path)
+    cached = Global.video_captchas_file_id.get(file_path)
+    if cached is not None:
+        try:
+            file_mtime = stat(file_path).st_mtime_ns
+        except OSError:
+            file_mtime = None
+        if cached[0] == file_mtime:
+            return cached[1]
+        del Global.video_captchas_file_id[file_path]
+    if not CONST["VIDEO_CAPTCHAS_CACHE_CHAT"]:
+        return None
+    try:
+        with open(file_path, "rb") as file:
+            sent_result = await tlg_send_video(
+                bot, CONST["VIDEO_CAPTCHAS_CACHE_CHAT"], file,
+                read_timeout=20, filename="captcha.mp4",
+                disable_notification=True)
+    except Exception:
+        logger.error(format_exc())
+        logger.error("Fail to upload video captcha to cache chat")
+        return None
+    if sent_result["msg"] is None:
+        return None
+    set_video_captcha_file_id(file_path, sent_result["msg"])
+    # The file_id is still valid after removing the message
+    await tlg_delete_msg(bot, CONST["VIDEO_CAPTCHAS_CACHE_CHAT"],
+                         sent_result["msg"].message_id)
+    cached = Global.video_captchas_file_id.get(file_path)
+    if cached is None:
+        return None
+    return cached[1]
+
+
 async def send_captcha_video(update, context, captcha_mode, captcha_timeout,
-                             chat_id, chat_title, lang, bilang, join_user_id,
+                             chat_id, chat_title, lang, join_user_id,
                              join_user_name, timeout_str):
     '''Send video captcha challenge.'''
     MAX_RETRIES = 5
@@ -1281,12 +1959,8 @@ async def send_captcha_video(update, context, captcha_mode, captcha_timeout,
     bot = context.bot
     # Prepare message text
     # Note: Video caption must be <= 1024 chars
-    img_caption = TEXT[lang]["CAPTCHA_VIDEO"].format(join_user_name,
-                                                     timeout_str)
-    if bilang:
-        en_text = TEXT["EN"]["CAPTCHA_VIDEO"].format(join_user_name,
-                                                     timeout_str)
-        img_caption = f"{img_caption}\n\n{en_text}"
+    img_caption = get_chat_msg(
+        chat_id, "CAPTCHA_VIDEO", join_user_name, timeout_str)
     img_caption = img_caption[:1024]
     # Get and send captcha
     sent_result = {}
@@ -1297,11 +1971,22 @@ async def send_captcha_video(update, context, captcha_mode, captcha_timeout,
             captcha_code = captcha.code
             logger.info("[%s] Sending captcha message to %s (%d): %s [video]",
                         chat_id, join_user_name, join_user_id, captcha_code)
+            # Send the video by its Telegram file_id if it was already
+            # uploaded
+            file_id = await get_video_captcha_file_id(bot, captcha.file)
+            if file_id is not None:
+                sent_result = await tlg_send_video(
+                    bot, chat_id, file_id, img_caption,
+                    priority=TLG_PRIORITY_HIGH)
+                if sent_result["msg"]:
+                    break
+                Global.video_captchas_file_id.pop(str(captcha.file), None)
             try:
                 with open(captcha.file, "rb") as file:
                     sent_result = await tlg_send_video(
                         bot, chat_id, file, img_caption, read_timeout=20,
-                        filename="captcha.mp4")
+                        filename="captcha.mp4", priority=TLG_PRIORITY_HIGH)
+                set_video_captcha_file_id(captcha.file, sent_result["msg"])
                 break
             except Exception:
                 logger.warning("[%s] Fail to send captcha msg, retrying...",
@@ -1324,7 +2009,7 @@ async def send_captcha_video(update, context, captcha_mode, captcha_timeout,
                        chat_id)
         send_success = await send_captcha_image(
             update, context, captcha_mode, captcha_timeout, chat_id,
-            chat_title, lang, bilang, join_user_id,
+            chat_title, lang, join_user_id,
             join_user_name, timeout_str)
     return send_success
 
@@ -1424,6 +2109,9 @@ async def chat_member_status_change(
     # Get User ID and Name
     join_user_id = join_user.id
     join_user_name = tlg_get_user_name(join_user, 35)
+    # Discard cached Admins list if a member was promoted or demoted
+    if tlg_member_admin_status_change(update.chat_member):
+        tlg_invalidate_chat_admins(chat_id)
     # Ignore if it is not a new member join
     if not tlg_member_has_join_group(update.chat_member):
         # Remove "TheJoinCaptchaBot removed USER" message
@@ -1455,11 +2143,10 @@ async def chat_member_status_change(
     # Check and remove previous join messages of that user (if any)
     if chat_id in Global.new_users:
         if join_user_id in Global.new_users[chat_id]:
-            if "msg_to_rm" in Global.new_users[chat_id][join_user_id]:
-                for msg in \
-                        Global.new_users[chat_id][join_user_id]["msg_to_rm"]:
-                    await delete_msg(bot, chat_id, msg)
-                Global.new_users[chat_id][join_user_id]["msg_to_rm"].clear()
+            user_data = Global.new_users[chat_id][join_user_id]
+            await delete_msgs(bot, chat_id, user_data.msg_to_rm)
+            user_data.clear_msgs_to_rm()
+            SessionData.user_changed(chat_id, join_user_id)
     # Ignore if the captcha protection is not enable in this chat
     captcha_enable = get_chat_config(chat_id, "Enabled")
     if not captcha_enable:
@@ -1467,11 +2154,16 @@ async def chat_member_status_change(
         return
     # Determine configured language and captcha settings
     lang = get_chat_config(chat_id, "Language")
-    bilang = None
-    if lang != "EN":
-        bilang = get_chat_config(chat_id, "BiLang")
     captcha_mode = get_chat_config(chat_id, "Captcha_Chars_Mode")
     captcha_timeout = get_chat_config(chat_id, "Captcha_Time")
+    # Check the chat joins rate and mute the new member right away (until
+    # the captcha timeout) if the chat is under a raid
+    await raid_mode_join(bot, chat_id, join_user_id)
+    raid_muted = False
+    if is_raid_mode(chat_id):
+        mute_time = max(captcha_timeout, CONST["T_RESTRICT_MIN"])
+        raid_muted = await restrict_user_mute(
+            bot, chat_id, join_user_id, get_unix_epoch() + mute_time)
     if captcha_timeout < CONST["T_SECONDS_IN_MIN"]:
         timeout_str = f"{captcha_timeout} sec"
     else:
@@ -1491,28 +2183,32 @@ async def chat_member_status_change(
     if captcha_mode == "video":
         send_success = await send_captcha_video(
             update, context, captcha_mode, captcha_timeout, chat_id,
-            chat_title, lang, bilang, join_user_id, join_user_name,
+            chat_title, lang, join_user_id, join_user_name,
             timeout_str)
     elif captcha_mode == "button":
         send_success = await send_captcha_button(
             update, context, captcha_mode, captcha_timeout, chat_id,
-            chat_title, lang, bilang, join_user_id,
-            join_user_name, timeout_str)
+            chat_title, lang, join_user_id,
+            join_user_name, timeout_str, raid_muted)
     elif captcha_mode == "poll":
         send_success = await send_captcha_poll(
             update, context, captcha_mode, captcha_timeout, chat_id,
-            chat_title, lang, bilang, join_user_id,
-            join_user_name, timeout_str)
+            chat_title, lang, join_user_id,
+            join_user_name, timeout_str, raid_muted)
     else:  # Image captcha
         send_success = await send_captcha_image(
             update, context, captcha_mode, captcha_timeout, chat_id,
-            chat_title, lang, bilang, join_user_id,
+            chat_title, lang, join_user_id,
             join_user_name, timeout_str)
     if send_success:
         logger.info("[%s] Captcha challenge send sucess.", chat_id)
     else:
         logger.error("[%s] Captcha challenge send fail (%s).",
                      chat_id, captcha_mode)
+        # The user won't be handled by the captcha process, remove the
+        # raid mode mute
+        if raid_muted:
+            await tlg_unrestrict_user(bot, chat_id, join_user_id)
 
 
 async def user_joined_group_msg_rx(
@@ -1550,7 +2246,8 @@ async def user_joined_group_msg_rx(
             continue
         # If user has join the group, add the "USER joined the group"
         # message ID to new user data to be removed
-        Global.new_users[chat_id][join_user.id]["join_msg"] = msg_id
+        Global.new_users[chat_id][join_user.id].join_msg = msg_id
+        SessionData.user_changed(chat_id, join_user.id)
 
 
 async def user_left_group(
@@ -1666,7 +2363,7 @@ async def text_msg_rx_verified_user(bot, msg, msg_text):
         # Get Chat configured language
         lang = get_chat_config(chat_id, "Language")
         # Check for Spam (check if the message contains any URL)
-        has_url = re.search(CONST["REGEX_URLS"], msg_text)
+        has_url = Global.regex_urls.search(msg_text)
         if has_url is None:
             return
         # Try to remove the message and notify detection
@@ -1695,7 +2392,7 @@ async def handle_spam(bot, msg, msg_text):
         spam_msg = True
     if not spam_msg and tlg_get_embedded_url_in_msg(msg):
         spam_msg = True
-    if not spam_msg and re.search(CONST["REGEX_URLS"], msg_text):
+    if not spam_msg and Global.regex_urls.search(msg_text):
         spam_msg = True
     # Handle Spam
     if not spam_msg:
@@ -1723,7 +2420,7 @@ async def handle_captcha_text_answer(bot, msg, msg_text):
     user_name = msg.from_user.name
     # Do nothing if no image captcha mode
     captcha_mode = \
-        Global.new_users[chat_id][user_id]["join_data"]["captcha_mode"]
+        Global.new_users[chat_id][user_id].captcha_mode
     if captcha_mode not in ["video", "nums", "hex", "ascii", "math"]:
         return
     # Get configured language
@@ -1732,28 +2429,24 @@ async def handle_captcha_text_answer(bot, msg, msg_text):
                 chat_id, user_name, msg_text)
     # Check if the expected captcha solve number is in the message
     captcha_code = \
-        Global.new_users[chat_id][user_id]["join_data"]["captcha_code"]
+        Global.new_users[chat_id][user_id].captcha_code
     if is_captcha_num_solve(captcha_mode, msg_text, captcha_code):
         logger.info("[%s] Captcha solved by %s", chat_id, user_name)
         # Remove all restrictions on the user
         await tlg_unrestrict_user(bot, chat_id, user_id)
         # Remove join messages
-        Global.new_users[chat_id][user_id]["msg_to_rm"].append(msg_id)
-        for msg in Global.new_users[chat_id][user_id]["msg_to_rm"]:
-            await delete_msg(bot, chat_id, msg)
-        Global.new_users[chat_id][user_id]["msg_to_rm"].clear()
-        del Global.new_users[chat_id][user_id]
-        # Remove user captcha numbers message
-        await delete_msg(bot, chat_id, msg_id)
+        # (including the user captcha numbers message)
+        Global.new_users[chat_id][user_id].msg_to_rm.append(msg_id)
+        await delete_msgs(
+            bot, chat_id, Global.new_users[chat_id][user_id].msg_to_rm)
+        Global.new_users[chat_id][user_id].clear_msgs_to_rm()
+        SessionData.user_changed(chat_id, user_id)
+        remove_join_user_data(chat_id, user_id)
         # Send message solve message
-        bot_msg = TEXT[lang]["CAPTCHA_SOLVED"].format(user_name)
-        if lang != "EN":
-            bilang = get_chat_config(chat_id, "BiLang")
-            if bilang:
-                en_text = TEXT["EN"]["CAPTCHA_SOLVED"].format(user_name)
-                bot_msg = f"{bot_msg}\n\n{en_text}"
-        rm_result_msg = get_chat_config(chat_id, "Rm_Result_Msg")
-        await tlg_bot_send_msg(bot, chat_id, bot_msg, rm_result_msg)
+        if not raid_mode_result(chat_id, user_id, "solved"):
+            bot_msg = get_chat_msg(chat_id, "CAPTCHA_SOLVED", user_name)
+            rm_result_msg = get_chat_config(chat_id, "Rm_Result_Msg")
+            await send_result_msg(bot, chat_id, bot_msg, rm_result_msg)
         # Check for custom welcome message and send it
         welcome_msg = get_chat_config(chat_id, "Welcome_Msg").format(
             escape_markdown(user_name, 2))
@@ -1789,12 +2482,14 @@ async def handle_captcha_text_answer(bot, msg, msg_text):
             # Directly remove messages from unverified users
             delete_result = await delete_msg(bot, chat_id, msg_id)
             if delete_result["error"] != "":
-                Global.new_users[chat_id][user_id]["msg_to_rm"].append(msg_id)
+                Global.new_users[chat_id][user_id].msg_to_rm.append(msg_id)
+                SessionData.user_changed(chat_id, user_id)
         else:
             # Check if received user msgs should be removed after kick/ban
             rm_all_msg = get_chat_config(chat_id, "RM_All_Msg")
             if rm_all_msg:
-                Global.new_users[chat_id][user_id]["msg_to_rm"].append(msg_id)
+                Global.new_users[chat_id][user_id].msg_to_rm.append(msg_id)
+                SessionData.user_changed(chat_id, user_id)
         # Notify wrong code
         wrong_code_msg_text = TEXT[lang]["CAPTCHA_INCORRECT"]
         if captcha_mode == "math":
@@ -1803,7 +2498,8 @@ async def handle_captcha_text_answer(bot, msg, msg_text):
             bot, chat_id, wrong_code_msg_text, CONST["T_FAST_DEL_MSG"],
             topic_id=topic_id)
         if sent_msg_id:
-            Global.new_users[chat_id][user_id]["msg_to_rm"].append(sent_msg_id)
+            Global.new_users[chat_id][user_id].msg_to_rm.append(sent_msg_id)
+            SessionData.user_changed(chat_id, user_id)
     logger.info("[%s] Captcha reply process completed.", chat_id)
 
 
@@ -1893,35 +2589,55 @@ async def poll_answer_rx(
         "[%s] User %s select poll option %d",
         chat_id, from_user.name, option_answer)
     await tlg_stop_poll(bot, chat_id, poll_msg_id)
-    # Get user name
-    user_name = from_user.name
+    # Handle the vote result in a task, to don't hold the chat updates
+    # while the poll animation is shown
+    context.application.create_task(
+        poll_answer_result(
+            bot, chat_id, user_id, from_user.name,
+            option_answer == poll_correct_option),
+        update=update)
+
+
+async def poll_answer_result(bot, chat_id, user_id, user_name, solved):
+    '''
+    Handle the poll captcha result of a user, once the poll stop
+    animation has been shown.
+    '''
+    # Wait 3s to let poll animation be shown
+    await asyncio_sleep(3)
+    # Ignore if the captcha process of the user has already finished
+    # meanwhile (user left the chat, captcha timeout, etc.)
+    # Note: this runs outside the chat updates handling, so the user
+    # data is checked again after each request
+    if not is_unverified_user(chat_id, user_id):
+        return
+    user_data = Global.new_users[chat_id][user_id]
+    if user_data.kicked_ban:
+        return
+    # The result is handled here, so drop the user captcha timeout
+    Global.captcha_deadlines.pop((chat_id, user_id), None)
     # Get chat settings
-    lang = get_chat_config(chat_id, "Language")
     rm_result_msg = get_chat_config(chat_id, "Rm_Result_Msg")
     rm_welcome_msg = get_chat_config(chat_id, "Rm_Welcome_Msg")
     welcome_msg = get_chat_config(chat_id, "Welcome_Msg").format(
         escape_markdown(user_name, 2))
     restrict_non_text_msgs = get_chat_config(chat_id, "Restrict_Non_Text")
-    # Wait 3s to let poll animation be shown
-    await asyncio_sleep(3)
     # Remove previous join messages
-    for msg in Global.new_users[chat_id][user_id]["msg_to_rm"]:
-        await delete_msg(bot, chat_id, msg)
-    Global.new_users[chat_id][user_id]["msg_to_rm"].clear()
+    await delete_msgs(bot, chat_id, list(user_data.msg_to_rm))
+    if not is_pending_user_data(chat_id, user_id, user_data):
+        return
+    user_data.clear_msgs_to_rm()
+    SessionData.user_changed(chat_id, user_id)
     # Check if user vote the correct option
-    if option_answer == poll_correct_option:
+    if solved:
         logger.info("[%s] User %s solve a poll challenge.", chat_id, user_name)
+        remove_join_user_data(chat_id, user_id)
         # Remove all restrictions on the user
         await tlg_unrestrict_user(bot, chat_id, user_id)
         # Send captcha solved message
-        bot_msg = TEXT[lang]["CAPTCHA_SOLVED"].format(user_name)
-        if lang != "EN":
-            bilang = get_chat_config(chat_id, "BiLang")
-            if bilang:
-                en_text = TEXT["EN"]["CAPTCHA_SOLVED"].format(user_name)
-                bot_msg = f"{bot_msg}\n\n{en_text}"
-        await tlg_bot_send_msg(bot, chat_id, bot_msg, rm_result_msg)
-        del Global.new_users[chat_id][user_id]
+        if not raid_mode_result(chat_id, user_id, "solved"):
+            bot_msg = get_chat_msg(chat_id, "CAPTCHA_SOLVED", user_name)
+            await send_result_msg(bot, chat_id, bot_msg, rm_result_msg)
         # Check for custom welcome message and send it
         if welcome_msg != "-":
             if rm_welcome_msg:
@@ -1948,14 +2664,11 @@ async def poll_answer_rx(
         logger.info("[%s] User %s fail poll.", chat_id, user_name)
         restriction = get_chat_config(chat_id, "Fail_Restriction")
         if restriction == CMD["RESTRICTION"]["KICK"]:
-            bot_msg = TEXT[lang]["CAPTCHA_POLL_FAIL"].format(user_name)
-            if lang != "EN":
-                bilang = get_chat_config(chat_id, "BiLang")
-                if bilang:
-                    en_text = TEXT["EN"]["CAPTCHA_POLL_FAIL"].format(user_name)
-                    bot_msg = f"{bot_msg}\n\n{en_text}"
+            bot_msg = get_chat_msg(chat_id, "CAPTCHA_POLL_FAIL", user_name)
             await tlg_bot_send_msg(bot, chat_id, bot_msg, rm_result_msg)
             await asyncio_sleep(10)
+            if not is_pending_user_data(chat_id, user_id, user_data):
+                return
         # Try to punish the user
         await captcha_fail_member(bot, chat_id, user_id)
     logger.info("[%s] Poll captcha process completed.", chat_id)
@@ -2031,56 +2744,46 @@ async def button_request_another_captcha_press(bot, query):
     # Get current chat configurations
     captcha_level = get_chat_config(chat_id, "Captcha_Difficulty_Level")
     captcha_mode = \
-        Global.new_users[chat_id][user_id]["join_data"]["captcha_mode"]
+        Global.new_users[chat_id][user_id].captcha_mode
     # Use nums mode if captcha_mode was changed while captcha was
     # in progress
     if captcha_mode not in {"nums", "hex", "ascii", "math"}:
         captcha_mode = "nums"
     # Generate a new captcha and edit previous captcha image message
-    captcha = create_image_captcha(
+    captcha = await get_image_captcha(
         chat_id, user_id, captcha_level, captcha_mode)
     if captcha_mode == "math":
         captcha_code = captcha["equation_result"]
         logger.info("[%s] Sending new captcha msg: %s = %s...",
                     chat_id, captcha["equation_str"], captcha_code)
-        img_caption = TEXT[lang]["NEW_USER_MATH_CAPTION"].format(
+        img_caption = get_chat_msg(
+            chat_id, "NEW_USER_MATH_CAPTION",
             user_name, chat_title, timeout_str)
-        if lang != "EN":
-            bilang = get_chat_config(chat_id, "BiLang")
-            if bilang:
-                en_text = TEXT["EN"]["NEW_USER_MATH_CAPTION"].format(
-                    user_name, chat_title, timeout_str)
-                img_caption = f"{img_caption}\n\n{en_text}"
     else:
         captcha_code = captcha["characters"]
         logger.info("[%s] Sending new captcha msg: %s...",
                     chat_id, captcha_code)
-        img_caption = TEXT[lang]["NEW_USER_IMG_CAPTION"].format(
+        img_caption = get_chat_msg(
+            chat_id, "NEW_USER_IMG_CAPTION",
             user_name, chat_title, timeout_str)
-        if lang != "EN":
-            bilang = get_chat_config(chat_id, "BiLang")
-            if bilang:
-                en_text = TEXT["EN"]["NEW_USER_IMG_CAPTION"].format(
-                    user_name, chat_title, timeout_str)
-                img_caption = f"{img_caption}\n\n{en_text}"
     # Read and send image
     edit_result = {}
     try:
-        with open(captcha["image"], "rb") as file_img:
+        with open_image_captcha(captcha) as file_img:
             input_media = InputMediaPhoto(media=file_img, caption=img_caption)
             edit_result = await tlg_edit_msg_media(
                 bot, chat_id, msg_id, media=input_media,
                 reply_markup=reply_markup)
         if edit_result["error"] == "":
             # Set and modified to new expected captcha number
-            Global.new_users[chat_id][user_id]["join_data"]["captcha_code"] = \
+            Global.new_users[chat_id][user_id].captcha_code = \
                 captcha_code
-            # Remove sent captcha image file from file system
-            if path.exists(captcha["image"]):
-                remove(captcha["image"])
+            SessionData.user_changed(chat_id, user_id)
     except Exception:
         logger.error(format_exc())
         logger.error("Fail to update image for Telegram")
+    # Remove sent captcha image file from file system
+    remove_image_captcha(captcha)
     logger.info("[%s] New captcha request process completed.", chat_id)
 
 
@@ -2102,13 +2805,12 @@ async def button_im_not_a_bot_press(bot, query):
     if user_id not in Global.new_users[chat_id]:
         return
     # Get chat settings
-    lang = get_chat_config(chat_id, "Language")
     rm_result_msg = get_chat_config(chat_id, "Rm_Result_Msg")
     # Remove previous join messages
-    for msg in Global.new_users[chat_id][user_id]["msg_to_rm"]:
-        await delete_msg(bot, chat_id, msg)
+    await delete_msgs(
+        bot, chat_id, Global.new_users[chat_id][user_id].msg_to_rm)
     # Remove user from captcha process
-    del Global.new_users[chat_id][user_id]
+    remove_join_user_data(chat_id, user_id)
     # Send message solve message
     logger.info(
         "[%s] User %s solved a button challenge.",
@@ -2116,13 +2818,9 @@ async def button_im_not_a_bot_press(bot, query):
     # Remove all restrictions on the user
     await tlg_unrestrict_user(bot, chat_id, user_id)
     # Send captcha solved message
-    bot_msg = TEXT[lang]["CAPTCHA_SOLVED"].format(user_name)
-    if lang != "EN":
-        bilang = get_chat_config(chat_id, "BiLang")
-        if bilang:
-            en_text = TEXT["EN"]["CAPTCHA_SOLVED"].format(user_name)
-            bot_msg = f"{bot_msg}\n\n{en_text}"
-    await tlg_bot_send_msg(bot, chat_id, bot_msg, rm_result_msg)
+    if not raid_mode_result(chat_id, user_id, "solved"):
+        bot_msg = get_chat_msg(chat_id, "CAPTCHA_SOLVED", user_name)
+        await send_result_msg(bot, chat_id, bot_msg, rm_result_msg)
     # Check for custom welcome message and send it
     welcome_msg = ""
     welcome_msg = get_chat_config(chat_id, "Welcome_Msg").format(
@@ -2290,6 +2988,7 @@ async def cmd_connect(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Connection
     group_lang = get_chat_config(group_id, "Language")
     Global.connections[user_id] = {"group_id": group_id, "lang": group_lang}
+    SessionData.connection_changed(user_id)
     await tlg_send_msg_type_chat(
         bot, chat_type, chat_id, TEXT[lang]["CONNECT_OK"].format(group_id),
         topic_id=tlg_get_msg_topic(update_msg))
@@ -2332,6 +3031,7 @@ async def cmd_disconnect(update: Update, context: ContextTypes.DEFAULT_TYPE):
     lang = Global.connections[user_id]["lang"]
     group_id = Global.connections[user_id]["group_id"]
     del Global.connections[user_id]
+    SessionData.connection_changed(user_id)
     await tlg_send_msg_type_chat(
         bot, chat_type, chat_id,
         TEXT[lang]["DISCONNECT_OK"].format(group_id),
@@ -2478,6 +3178,7 @@ async def cmd_language(update: Update, context: ContextTypes.DEFAULT_TYPE):
             save_config_property(group_id, "Language", lang)
             if (chat_type == "private") and (user_id in Global.connections):
                 Global.connections[user_id]["lang"] = lang
+                SessionData.connection_changed(user_id)
             msg_text = TEXT[lang]["LANG_CHANGE"]
     else:
         msg_text = TEXT[lang]["LANG_BAD_LANG"].format(
@@ -3775,8 +4476,8 @@ async def cmd_captcha(update: Update, context: ContextTypes.DEFAULT_TYPE):
             except Exception:
                 pass
     else:
-        captcha = create_image_captcha(chat_id, user_id, difficulty,
-                                       captcha_mode)
+        captcha = await create_image_captcha(chat_id, user_id, difficulty,
+                                             captcha_mode)
         if captcha_mode == "math":
             captcha_code = \
                 f'{captcha["equation_str"]} = {captcha["equation_result"]}'
@@ -3786,15 +4487,14 @@ async def cmd_captcha(update: Update, context: ContextTypes.DEFAULT_TYPE):
                    f"Captcha Mode: {captcha_mode}\n"
                    f"Captcha Code: {captcha_code}")
         try:
-            with open(captcha["image"], "rb") as file_image:
+            with open_image_captcha(captcha) as file_image:
                 await tlg_send_image(bot, chat_id, file_image, caption,
                                      topic_id=tlg_get_msg_topic(update_msg),
                                      read_timeout=20)
         except Exception:
             pass
         # Remove sent captcha image file from file system
-        if path.exists(captcha["image"]):
-            remove(captcha["image"])
+        remove_image_captcha(captcha)
 
 
 async def cmd_allowuserlist(
@@ -3855,6 +4555,7 @@ async def cmd_allowuserlist(
             return
         if user not in l_white_users:
             file_write(CONST["F_ALLOWED_USERS"], f"{user}\n")
+            reload_list_file(CONST["F_ALLOWED_USERS"])
             await tlg_send_msg(
                 bot, chat_id,
                 "User added to Global allowed list.",
@@ -3873,6 +4574,7 @@ async def cmd_allowuserlist(
             return
         if list_remove_element(l_white_users, user):
             file_write(CONST["F_ALLOWED_USERS"], l_white_users, "w")
+            reload_list_file(CONST["F_ALLOWED_USERS"])
             await tlg_send_msg(
                 bot, chat_id,
                 "User removed from Global allowed list.",
@@ -3935,6 +4637,7 @@ async def cmd_allowgroup(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
         if group not in l_allowed_groups:
             file_write(CONST["F_ALLOWED_GROUPS"], f"{group}\n")
+            reload_list_file(CONST["F_ALLOWED_GROUPS"])
             await tlg_send_msg(
                 bot, chat_id, "Group added to allowed list.",
                 topic_id=topic_id)
@@ -3952,6 +4655,7 @@ async def cmd_allowgroup(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
         if list_remove_element(l_allowed_groups, group):
             file_write(CONST["F_ALLOWED_GROUPS"], l_allowed_groups, "w")
+            reload_list_file(CONST["F_ALLOWED_GROUPS"])
             await tlg_send_msg(
                 bot, chat_id, "Group removed from allowed list.",
                 topic_id=topic_id)
@@ -3965,42 +4669,63 @@ async def cmd_allowgroup(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # Bot automatic delete sent messages coroutine
 ###############################################################################
 
+async def auto_delete_chat_msgs(bot, chat_id, msg_ids):
+    '''
+    Remove the auto-delete messages of a chat which delete time has
+    arrived.
+    '''
+    delete_result = await delete_msgs(bot, chat_id, msg_ids)
+    # The bot has no privileges to delete messages
+    for msg_id, error in delete_result["failed"].items():
+        if error != "Message can't be deleted":
+            continue
+        lang = get_chat_config(chat_id, "Language")
+        sent_result = await tlg_send_msg(
+            bot, chat_id, TEXT[lang]["CANT_DEL_MSG"],
+            reply_to_message_id=msg_id)
+        if sent_result["msg"] is not None:
+            tlg_autodelete_msg(sent_result["msg"])
+        # Just notify it once
+        break
+
+
 async def auto_delete_messages(bot):
     '''
     Handle remove messages sent by the Bot with the timed auto-delete
     function.
+    The coroutine sleeps until the delete time of the first message in
+    the to-delete queue arrives, or until a message that needs to be
+    deleted before is added to the queue.
     '''
+    Global.auto_delete_wakeup = AsyncioEvent()
     while not Global.force_exit:
-        # Release CPU sleeping on each iteration
-        await asyncio_sleep(0.01)
-        # Check each Bot sent message
-        i = 0
-        while i < len(Global.to_delete_in_time_messages_list):
+        # Delete all messages which delete time has arrived, together
+        # with the ones that will arrive soon, with a request per chat
+        to_delete = Global.to_delete_in_time_messages_list
+        while to_delete and (to_delete[0].due_time <= time()):
             # Check for break iterating if script must exit
             if Global.force_exit:
                 return
-            sent_msg = Global.to_delete_in_time_messages_list[i]
-            # Sleep each 100 iterations
-            i = i + 1
-            if (i > 1) and ((i % 1000) == 0):
-                await asyncio_sleep(0.01)
-            # Check if delete time has arrive for this message
-            if time() - sent_msg["time"] < sent_msg["delete_time"]:
-                continue
-            # Delete message
-            delete_result = await delete_msg(
-                bot, sent_msg["Chat_id"], sent_msg["Msg_id"])
-            # The bot has no privileges to delete messages
-            if delete_result["error"] == "Message can't be deleted":
-                lang = get_chat_config(sent_msg["Chat_id"], "Language")
-                sent_result = await tlg_send_msg(
-                    bot, sent_msg["Chat_id"], TEXT[lang]["CANT_DEL_MSG"],
-                    reply_to_message_id=sent_msg["Msg_id"])
-                if sent_result["msg"] is not None:
-                    tlg_autodelete_msg(sent_result["msg"])
-            list_remove_element(
-                Global.to_delete_in_time_messages_list, sent_msg)
-            await asyncio_sleep(0.01)
+            chats_msgs = {}
+            coalesce_time = time() + CONST["T_DEL_MSG_COALESCE"]
+            while to_delete and (to_delete[0].due_time <= coalesce_time):
+                sent_msg = heappop(to_delete)
+                SessionData.msg_removed(sent_msg.seq)
+                chats_msgs.setdefault(sent_msg.chat_id, []).append(
+                    sent_msg.msg_id)
+            await asyncio_gather(*[
+                auto_delete_chat_msgs(bot, chat_id, msg_ids)
+                for chat_id, msg_ids in chats_msgs.items()
+            ])
+        # Sleep until next delete time, a new message is scheduled, the
+        # Bot exit is requested or a max idle time
+        sleep_time = CONST["T_COROUTINES_MAX_SLEEP"]
+        if Global.to_delete_in_time_messages_list:
+            next_delete_time = \
+                Global.to_delete_in_time_messages_list[0].due_time
+            sleep_time = min(sleep_time, max(next_delete_time - time(), 0))
+        Global.auto_delete_wakeup.clear()
+        await coroutine_sleep(Global.auto_delete_wakeup, sleep_time)
     logger.info("Auto-delete messages coroutine finished")
 
 
@@ -4008,67 +4733,79 @@ async def auto_delete_messages(bot):
 # Handle captcha process timeout (time to kick/ban users) coroutine
 ###############################################################################
 
+async def captcha_timeout_fail_member(bot, chat_id, user_id):
+    '''Kick/ban an user that has not completed the captcha in time.'''
+    try:
+        await captcha_fail_member(bot, chat_id, user_id)
+    except Exception:
+        logger.error(format_exc())
+        logger.error("Fail to kick/ban an user")
+
+
 async def captcha_timeout(bot):
     '''
     Check if the time for ban new users that has not completed the
     captcha has arrived.
+    The coroutine sleeps until the first captcha process deadline of the
+    queue arrives, or until a sooner deadline is added to the queue.
     '''
+    Global.captcha_timeout_wakeup = AsyncioEvent()
     while not Global.force_exit:
-        # Release CPU sleeping on each iteration
-        await asyncio_sleep(0.01)
-        # Get all id from users in captcha process (list shallow copy)
-        users_id = []
-        chats_id_list = list(Global.new_users.keys()).copy()
-        for chat_id in chats_id_list:
-            users_id_list = list(Global.new_users[chat_id].keys()).copy()
-            for user_id in users_id_list:
-                if user_id not in users_id:
-                    users_id.append(user_id)
-        # For each user id check for time to kick in each chat
-        i = 0
-        for user_id in users_id:
-            for chat_id in chats_id_list:
-                # Sleep each 1000 iterations
-                i = i + 1
-                if i > 1000:
-                    i = 0
-                    await asyncio_sleep(0.01)
-                # Check if script must exit for end coroutine
-                if Global.force_exit:
-                    return
-                # Ignore if user is not in this chat
-                if user_id not in Global.new_users[chat_id]:
-                    continue
-                try:
-                    user_join_data = \
-                        Global.new_users[chat_id][user_id]["join_data"]
-                    user_join_time = user_join_data["join_time"]
-                    captcha_timeout = user_join_data["captcha_timeout"]
-                    if user_join_data["kicked_ban"]:
-                        # Remove from new users list the remaining
-                        # kicked users that have not solve the captcha
-                        # in 30 mins (user ban just happen if a user try
-                        # to join the group and fail to solve the
-                        # captcha 5 times in the past 30 mins)
-                        if time() - user_join_time < captcha_timeout + 1800:
-                            continue
-                        logger.info(
-                            "Removing kicked user %s after 30 mins",
-                            user_id)
-                        del Global.new_users[chat_id][user_id]
-                    else:
-                        # If time for kick/ban has not arrived yet
-                        if time() - user_join_time < captcha_timeout:
-                            continue
-                        user_name = user_join_data["user_name"]
-                        logger.info(
-                            "[%s] Captcha reply timeout for user %s.",
-                            chat_id, user_name)
-                        await captcha_fail_member(bot, chat_id, user_id)
-                        await asyncio_sleep(0.01)
-                except Exception:
-                    logger.error(format_exc())
-                    logger.error("Fail to kick/ban an user")
+        # Handle all users which captcha process deadline has arrived
+        # (users to kick/ban are handled concurrently)
+        users_to_fail = []
+        while Global.captcha_deadlines_list:
+            # Check if script must exit for end coroutine
+            if Global.force_exit:
+                return
+            deadline, chat_id, user_id = Global.captcha_deadlines_list[0]
+            if deadline > time():
+                break
+            heappop(Global.captcha_deadlines_list)
+            # Ignore outdated deadlines (captcha solved, user join again,
+            # user kicked, etc.)
+            user_key = (chat_id, user_id)
+            if Global.captcha_deadlines.get(user_key, None) != deadline:
+                continue
+            del Global.captcha_deadlines[user_key]
+            if not is_unverified_user(chat_id, user_id):
+                continue
+            try:
+                user_data = Global.new_users[chat_id][user_id]
+                if user_data.kicked_ban:
+                    # Remove from new users list the remaining kicked
+                    # users that have not solve the captcha in 30 mins
+                    # (user ban just happen if a user try to join the
+                    # group and fail to solve the captcha 5 times in the
+                    # past 30 mins)
+                    logger.info(
+                        "Removing kicked user %s after 30 mins", user_id)
+                    remove_join_user_data(chat_id, user_id)
+                else:
+                    user_name = user_data.user_name
+                    logger.info(
+                        "[%s] Captcha reply timeout for user %s.",
+                        chat_id, user_name)
+                    users_to_fail.append(
+                        captcha_timeout_fail_member(bot, chat_id, user_id))
+            except Exception:
+                logger.error(format_exc())
+                logger.error("Fail to kick/ban an user")
+        if users_to_fail:
+            await asyncio_gather(*users_to_fail)
+        # Return to normal mode the chats which raid has finished
+        await raid_mode_check(bot)
+        # Sleep until next deadline, a sooner deadline is added, the Bot
+        # exit is requested or a max idle time (chats in raid mode are
+        # checked periodically)
+        sleep_time = CONST["T_COROUTINES_MAX_SLEEP"]
+        if is_any_raid_in_progress():
+            sleep_time = CONST["T_RAID_CHECK"]
+        if Global.captcha_deadlines_list:
+            next_deadline = Global.captcha_deadlines_list[0][0]
+            sleep_time = min(sleep_time, max(next_deadline - time(), 0))
+        Global.captcha_timeout_wakeup.clear()
+        await coroutine_sleep(Global.captcha_timeout_wakeup, sleep_time)
     logger.info("Captcha timeout coroutine finished")
 
 
@@ -4101,8 +4838,9 @@ async def tlg_error_callback(update, context: ContextTypes.DEFAULT_TYPE):
         logger.error("TLG Error: Network Problem")
     except PassportDecryptionError:
         logger.error("TLG Error: Passport Decryption Error")
-    except RetryAfter:
-        logger.error("TLG Error: Retry After")
+    except RetryAfter as error:
+        logger.error("TLG Error: Retry After %ss (%s)", error.retry_after,
+                     tlg_get_rate_limiter_stats())
     except TelegramError as error:
         logger.error("TLG Error: %s", str(error))
 
@@ -4119,6 +4857,8 @@ def tlg_app_setup(token: str) -> Application:
     # Initialize Resources and restore last session
     initialize_resources()
     restore_session()
+    tlg_set_chat_admins_cache_ttl(CONST["T_ADMINS_CACHE"])
+    tlg_set_rate_limits(CONST["API_RATE_GLOBAL"], CONST["API_RATE_GROUP"])
     # Create the Telegram Bot Application Builder
     # Set Bot Token
     # Set messages to be sent silently by default
@@ -4127,9 +4867,18 @@ def tlg_app_setup(token: str) -> Application:
     app_builder.token(token)
     app_builder.defaults(Defaults(disable_notification=True))
     app_builder.post_init(tlg_app_start)
+    app_builder.post_stop(tlg_app_stop)
     app_builder.post_shutdown(tlg_app_exit)
+    # Set updates of different chats to be handled concurrently, but
+    # updates of the same chat one by one and in order
+    update_processor = ChatUpdateProcessor(
+        CONST["MAX_CONCURRENT_UPDATES"], CONST["MAX_CHAT_PENDING_UPDATES"],
+        shed_resolver=can_shed_update)
+    app_builder.concurrent_updates(update_processor)
     # Build the Bot Application
     app = app_builder.build()
+    update_processor.chat_key_resolver = \
+        lambda update: get_update_chat_id(app.bot_data, update)
     # Set Telegram errors handler
     app.add_error_handler(tlg_error_callback)
     # Set all expected commands messages handler
@@ -4174,7 +4923,7 @@ def tlg_app_setup(token: str) -> Application:
     if (CONST["BOT_OWNER"] != "XXXXXXXXX") and CONST["BOT_PRIVATE"]:
         tlg_add_cmd(app, CMD["ALLOWGROUP"]["KEY"], cmd_allowgroup)
     # Set handler for text messages
-    app.add_handler(MessageHandler(filters.TEXT, text_msg_rx, block=False))
+    app.add_handler(MessageHandler(filters.TEXT, text_msg_rx))
     # Set handler for media messages
     # pylint: disable=E1131
     app.add_handler(
@@ -4220,7 +4969,7 @@ def tlg_app_setup(token: str) -> Application:
     # and button captcha challenge)
     app.add_handler(CallbackQueryHandler(button_press_rx))
     # Set handler for users poll vote
-    app.add_handler(PollAnswerHandler(poll_answer_rx, block=False))
+    app.add_handler(PollAnswerHandler(poll_answer_rx))
     logger.info("Bot setup completed.")
     return app
 
@@ -4271,6 +5020,12 @@ async def tlg_app_start(app: Application) -> None:
     Telegram Bot Application initialized.
     This function is called at the startup of run_polling() or
     run_webhook() functions.'''
+    Global.exit_requested = AsyncioEvent()
+    # Start chats config files background writer
+    JsonWriter.start()
+    # Start Image Captcha Generator worker processes and pools
+    img_captcha_executor_start()
+    img_captcha_pool_start()
     # Setup and start Captcha Video Generator process
     CaptchaGenVideo.add_captcha_scene(CaptchaScene.CIRCLE_NUMS,
                                       {"theme": "dark", "noise": True})
@@ -4285,23 +5040,31 @@ async def tlg_app_start(app: Application) -> None:
         asyncio_create_task(captcha_timeout(app.bot))
     Global.async_auto_delete_messages = \
         asyncio_create_task(auto_delete_messages(app.bot))
+    Global.async_session_flush = asyncio_create_task(session_flush())
     logger.info("Auto-delete messages and captcha timeout coroutines started.")
 
 
 ###############################################################################
-# Bot Application Run Exit Function
+# Bot Application Run Stop Function
 ###############################################################################
 
-async def tlg_app_exit(app: Application) -> None:
+def request_exit():
+    '''Request the Bot coroutines to finish.'''
+    Global.force_exit = True
+    if Global.exit_requested is not None:
+        Global.exit_requested.set()
+
+
+async def tlg_app_stop(app: Application) -> None:
     '''
-    Telegram Bot Application finished.
-    This function is called at the exit of run_polling() or
-    run_webhook() functions when the Bot stops it execution.'''
+    Telegram Bot Application stopped.
+    This function is called when run_polling() or run_webhook() functions
+    stop handling updates, while the Bot can still send requests.'''
     # Disable unused arguments
     del app
     # Request to exit and wait to end coroutines
-    logger.info("Bot stopped. Releasing resources...")
-    Global.force_exit = True
+    logger.info("Bot stopped. Finishing pending tasks...")
+    request_exit()
     if Global.async_captcha_timeout is not None:
         if not Global.async_captcha_timeout.done():
             logger.info("Waiting coroutine end: captcha_timeout()")
@@ -4310,10 +5073,49 @@ async def tlg_app_exit(app: Application) -> None:
         if not Global.async_auto_delete_messages.done():
             logger.info("Waiting coroutine end: async_auto_delete_messages()")
             await Global.async_auto_delete_messages
+    # Send the collected result messages still not sent (they don't
+    # wait the collect time once the exit is requested)
+    result_msgs_tasks = [
+        pending["task"] for pending in Global.result_msgs.values()]
+    if result_msgs_tasks:
+        logger.info("Sending pending result messages of %d chats",
+                    len(result_msgs_tasks))
+        await asyncio_gather(*result_msgs_tasks, return_exceptions=True)
+
+
+###############################################################################
+# Bot Application Run Exit Function
+###############################################################################
+
+async def tlg_app_exit(app: Application) -> None:
+    '''
+    Telegram Bot Application finished.
+    This function is called at the exit of run_polling() or
+    run_webhook() functions when the Bot stops it execution.'''
+    # Disable unused arguments
+    del app
+    # Request to exit (if not already requested) and wait to end
+    # coroutines
+    logger.info("Bot finished. Releasing resources...")
+    request_exit()
+    if Global.async_session_flush is not None:
+        if not Global.async_session_flush.done():
+            logger.info("Waiting coroutine end: session_flush()")
+            await Global.async_session_flush
     # Stop the Captcha Video Generator process
     await CaptchaGenVideo.stop()
+    # Stop the Image Captcha Generator pools and worker processes
+    await img_captcha_pool_stop()
+    img_captcha_executor_stop()
+    logger.info("Chat config cache: %d hits, %d misses",
+                Global.chat_configs_hits, Global.chat_configs_misses)
+    logger.info("API rate limiter: %s", tlg_get_rate_limiter_stats())
+    logger.info("Members actions: %s", tlg_get_member_actions_stats())
     # Save current session data
     save_session()
+    # Close chats config database and write pending config files
+    ConfigData.close()
+    JsonWriter.stop()
     # Close the program
     logger.info("All resources released.")
 
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+
+'''
+Script:
+    sessiondb.py
+Description:
+    SQLite persistent storage of the Bot session RAM data (users in
+    captcha process, private connections and to-delete messages).
+    Changes are tracked as they happen and written incrementally, so
+    the stored session just contains the live state and it survives
+    unexpected Bot stops.
+Creation date:
+    18/10/2026
+Last modified date:
+    18/10/2026
+Version:
+    1.2.0
+'''
+
+###############################################################################
+# Standard Libraries
+###############################################################################
+
+# Logging Library
+import logging
+
+# Persistent RAM data serialization
+from pickle import dumps as pickle_dumps
+from pickle import loads as pickle_loads
+
+# SQLite Database Library
+import sqlite3
+
+# Error Traceback Library
+from traceback import format_exc
+
+
+###############################################################################
+# Logger Setup
+###############################################################################
+
+logger = logging.getLogger(__name__)
+
+
+###############################################################################
+# Constants
+###############################################################################
+
+# Database tables creation queries
+DB_TABLES = [
+    "CREATE TABLE IF NOT EXISTS new_users ("
+    "chat_id INTEGER NOT NULL, user_id INTEGER NOT NULL, data BLOB, "
+    "PRIMARY KEY (chat_id, user_id))",
+    "CREATE TABLE IF NOT EXISTS connections ("
+    "user_id INTEGER PRIMARY KEY, data BLOB)",
+    "CREATE TABLE IF NOT EXISTS to_delete_msgs ("
+    "seq INTEGER PRIMARY KEY, delete_at REAL, data BLOB)"
+]
+
+
+###############################################################################
+# Session Database Class
+###############################################################################
+
+class SessionDB():
+    '''
+    Session data SQLite storage with changes tracking.
+    The owner of the session data notify each change of a user in
+    captcha process, a connection or a to-delete message, and the
+    changes are periodically written with take_changes() and write().
+    The users in captcha process and the to-delete messages data can be
+    converted before being stored and after being loaded with the
+    user_encoder/user_decoder and msg_encoder/msg_decoder functions.
+    The to-delete messages are records with the schedule sequence number
+    (seq) and the delete time (due_time), and the msg_decoder function
+    gets the stored data and its sequence number.
+    '''
+
+    def __init__(self, file_path, user_encoder=None, user_decoder=None,
+                 msg_encoder=None, msg_decoder=None):
+        '''Constructor.'''
+        self.file_path = file_path
+        self.user_encoder = user_encoder
+        self.user_decoder = user_decoder
+        self.msg_encoder = msg_encoder
+        self.msg_decoder = msg_decoder
+        self.db = None
+        self.users_changed = set()
+        self.connections_changed = set()
+        self.msgs_added = {}
+        self.msgs_removed = set()
+        self.full_sync = False
+
+    def open(self):
+        '''Open (or create) the session database.'''
+        try:
+            self.db = sqlite3.connect(
+                self.file_path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            for query in DB_TABLES:
+                self.db.execute(query)
+            self.db.commit()
+        except Exception:
+            logger.error(format_exc())
+            logger.error("Fail to open session database %s", self.file_path)
+            self.db = None
+            return False
+        return True
+
+    def close(self):
+        '''Compact the database journal and close it.'''
+        if self.db is None:
+            return
+        try:
+            self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.db.close()
+        except Exception:
+            logger.error(format_exc())
+        self.db = None
+
+    def load(self):
+        '''
+        Get the stored session data.
+        The to-delete messages are returned as a list of the stored
+        messages data, in schedule order.
+        '''
+        data = {
+            "new_users": {},
+            "connections": {},
+            "to_delete_in_time_messages_list": []
+        }
+        if self.db is None:
+            return data
+        try:
+            for chat_id, user_id, user_data in self.db.execute(
+                    "SELECT chat_id, user_id, data FROM new_users"):
+                user_data = pickle_loads(user_data)
+                if self.user_decoder is not None:
+                    user_data = self.user_decoder(user_data)
+                data["new_users"].setdefault(chat_id, {})[user_id] = user_data
+            for user_id, connection in self.db.execute(
+                    "SELECT user_id, data FROM connections"):
+                data["connections"][user_id] = pickle_loads(connection)
+            for seq, msg_data in self.db.execute(
+                    "SELECT seq, data FROM to_delete_msgs ORDER BY seq"):
+                msg_data = pickle_loads(msg_data)
+                if self.msg_decoder is not None:
+                    msg_data = self.msg_decoder(msg_data, seq)
+                data["to_delete_in_time_messages_list"].append(msg_data)
+        except Exception:
+            logger.error(format_exc())
+            logger.error("Fail to load session database data")
+        return data
+
+    def user_changed(self, chat_id, user_id):
+        '''Notify a change of a user in captcha process data.'''
+        self.users_changed.add((chat_id, user_id))
+
+    def connection_changed(self, user_id):
+        '''Notify a change of a user private connection.'''
+        self.connections_changed.add(user_id)
+
+    def msg_added(self, msg_data):
+        '''Notify a new to-delete message.'''
+        self.msgs_added[msg_data.seq] = msg_data
+
+    def msg_removed(self, seq):
+        '''Notify a to-delete message has been handled.'''
+        if self.msgs_added.pop(seq, None) is None:
+            self.msgs_removed.add(seq)
+
+    def resync(self):
+        '''Request to rewrite all the session data in next write.'''
+        self.full_sync = True
+
+    def take_changes(self, new_users, connections, to_delete_msgs):
+        '''
+        Get and clear the pending changes, serialized from the current
+        session data, ready to be written (None if there is no change).
+        '''
+        batch = {
+            "full_sync": self.full_sync,
+            "users_set": [], "users_del": [],
+            "connections_set": [], "connections_del": [],
+            "msgs_set": [], "msgs_del": []
+        }
+        if self.full_sync:
+            for chat_id, chat_users in new_users.items():
+                for user_id, user_data in chat_users.items():
+                    batch["users_set"].append(
+                        (chat_id, user_id, self.encode_user(user_data)))
+            for user_id, connection in connections.items():
+                batch["connections_set"].append(
+                    (user_id, pickle_dumps(connection)))
+            for msg_data in to_delete_msgs:
+                batch["msgs_set"].append(
+                    (msg_data.seq, msg_data.due_time,
+                     self.encode_msg(msg_data)))
+        else:
+            if not (self.users_changed or self.connections_changed or
+                    self.msgs_added or self.msgs_removed):
+                return None
+            for chat_id, user_id in self.users_changed:
+                user_data = new_users.get(chat_id, {}).get(user_id)
+                if user_data is None:
+                    batch["users_del"].append((chat_id, user_id))
+                else:
+                    batch["users_set"].append(
+                        (chat_id, user_id, self.encode_user(user_data)))
+            for user_id in self.connections_changed:
+                connection = connections.get(user_id)
+                if connection is None:
+                    batch["connections_del"].append((user_id,))
+                else:
+                    batch["connections_set"].append(
+                        (user_id, pickle_dumps(connection)))
+            for seq, msg_data in self.msgs_added.items():
+                batch["msgs_set"].append(
+                    (seq, msg_data.due_time, self.encode_msg(msg_data)))
+            batch["msgs_del"] = [(seq,) for seq in self.msgs_removed]
+        self.full_sync = False
+        self.users_changed = set()
+        self.connections_changed = set()
+        self.msgs_added = {}
+        self.msgs_removed = set()
+        return batch
+
+    def encode_user(self, user_data):
+        '''Serialize the data of a user in captcha process.'''
+        if self.user_encoder is not None:
+            user_data = self.user_encoder(user_data)
+        return pickle_dumps(user_data)
+
+    def encode_msg(self, msg_data):
+        '''Serialize the data of a to-delete message.'''
+        if self.msg_encoder is not None:
+            msg_data = self.msg_encoder(msg_data)
+        return pickle_dumps(msg_data)
+
+    def write(self, batch):
+        '''
+        Write a batch of changes in a single transaction (it can be run
+        from a thread other than the one that takes the changes).
+        '''
+        if (self.db is None) or (batch is None):
+            return False
+        try:
+            with self.db:
+                if batch["full_sync"]:
+                    self.db.execute("DELETE FROM new_users")
+                    self.db.execute("DELETE FROM connections")
+                    self.db.execute("DELETE FROM to_delete_msgs")
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO new_users VALUES (?, ?, ?)",
+                    batch["users_set"])
+                self.db.executemany(
+                    "DELETE FROM new_users WHERE chat_id=? AND user_id=?",
+                    batch["users_del"])
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO connections VALUES (?, ?)",
+                    batch["connections_set"])
+                self.db.executemany(
+                    "DELETE FROM connections WHERE user_id=?",
+                    batch["connections_del"])
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO to_delete_msgs VALUES (?, ?, ?)",
+                    batch["msgs_set"])
+                self.db.executemany(
+                    "DELETE FROM to_delete_msgs WHERE seq=?",
+                    batch["msgs_del"])
+        except Exception:
+            logger.error(format_exc())
+            logger.error("Fail to write session database changes")
+            # Some changes were lost, write all the data next time
+            self.full_sync = True
+            return False
+        return True
+
+    def flush(self, new_users, connections, to_delete_msgs):
+        '''Write all pending changes.'''
+        batch = self.take_changes(new_users, connections, to_delete_msgs)
+        if batch is None:
+            return True
+        return self.write(batch)
@@ -81,6 +81,17 @@ SETTINGS = {
     # Chats directory path
     "CAPTCHABOT_CHATS_DIR": SCRIPT_PATH + "/data/chats",
 
+    # Chats configurations storage backend ("json" or "sqlite")
+    # json: Each chat configuration is stored in a JSON file inside its
+    # own directory of chats directory path
+    # sqlite: All chats configurations are stored in a SQLite database
+    # (the JSON files of chats directory path are imported at first run)
+    "CAPTCHABOT_CHATS_CONFIG_BACKEND": "json",
+
+    # Chats configurations SQLite database file path
+    # Note: only used if CAPTCHABOT_CHATS_CONFIG_BACKEND is "sqlite"
+    "CAPTCHABOT_CHATS_CONFIG_DB": SCRIPT_PATH + "/data/chats.db",
+
     # Directory where create/generate temporary captchas
     "CAPTCHABOT_CAPTCHAS_DIR": SCRIPT_PATH + "/data/captchas",
 
@@ -185,4 +196,76 @@ SETTINGS = {
     # Captcha Video File Generation interval (in seconds)
     # Means: Automatically create a new video captcha each this time
     "CAPTCHABOT_TIME_VIDEO_GEN_INTERVAL_S": 600,
+
+    # Video Captchas cache chat (i.e. "-1001234567890")
+    # Means: Private chat where the Bot uploads each generated video
+    # captcha once, to send it to the groups without uploading it again
+    # (if not set, each video captcha is uploaded in its first send)
+    "CAPTCHABOT_VIDEO_CAPTCHAS_CACHE_CHAT": None,
+
+    # Groups Administrators list cache time (in seconds)
+    # Means: Time to reuse a group Administrators list before request it
+    # again to Telegram (it is also updated on member promote/demote)
+    "CAPTCHABOT_T_ADMINS_CACHE": 300,
+
+    # Number of worker processes to generate image captchas
+    # Means: Image captchas are rendered in parallel in this number of
+    # processes (set to 0 to render them in threads of the Bot process)
+    "CAPTCHABOT_IMG_CAPTCHA_WORKERS": 2,
+
+    # Number of pre-generated image captchas of each mode and difficulty
+    # Means: Image captchas are generated in background and stored in
+    # memory ready to be sent when an user join (set to 0 to disable
+    # it and generate each captcha when it is needed)
+    "CAPTCHABOT_IMG_CAPTCHA_POOL_SIZE": 10,
+
+    # Image captchas pool refill threshold
+    # Means: Generate new image captchas of a mode and difficulty when
+    # its number of pre-generated captchas drops to this number
+    "CAPTCHABOT_IMG_CAPTCHA_POOL_LOW": 5,
+
+    # Keep generated image captchas in memory
+    # Means: Image captchas are sent directly from memory without
+    # storing them as temporary PNG files (set to False to use files)
+    "CAPTCHABOT_IMG_CAPTCHA_IN_MEMORY": True,
+
+    # Maximum number of updates processed at the same time
+    # Means: Updates of different groups are handled concurrently up to
+    # this number (updates of the same group are always handled one by
+    # one and in the order they were received)
+    "CAPTCHABOT_MAX_CONCURRENT_UPDATES": 256,
+
+    # Maximum number of pending updates of a group
+    # Means: New messages of a group that already has this number of
+    # updates waiting to be handled are discarded, unless they come from
+    # users in captcha process (new members, captcha answers, polls,
+    # buttons and commands are never discarded)
+    "CAPTCHABOT_MAX_CHAT_PENDING_UPDATES": 500,
+
+    # Bot API requests global rate limit (requests per second)
+    # Means: Maximum number of requests sent to Telegram each second,
+    # exceeding requests wait with captcha challenges sent first and
+    # messages removals last (set to 0 to disable the rate limiter)
+    "CAPTCHABOT_API_RATE_GLOBAL": 30,
+
+    # Bot API messages rate limit of each group (messages per minute)
+    # Means: Maximum number of messages sent to a group each minute
+    "CAPTCHABOT_API_RATE_GROUP": 20,
+
+    # Number of joins in a group that enables raid mode
+    # Means: If this number of users join a group in the raid detection
+    # time window, the group enters in raid mode, new members are muted
+    # on join and captcha results are notified in a single summary
+    # message when the raid ends (set to 0 to disable raid mode)
+    "CAPTCHABOT_RAID_JOINS": 20,
+
+    # Raid detection time window (in seconds)
+    "CAPTCHABOT_RAID_WINDOW": 10,
+
+    # Captcha result messages aggregation time (in seconds)
+    # Means: A captcha result (solved, kicked, restricted) of a group is
+    # notified as soon as it happens, but the next results of the group
+    # in this time are notified together in a single message (set to 0
+    # to send a message for each result as soon as it happens)
+    "CAPTCHABOT_T_RESULT_MSGS_WINDOW": 3,
 }
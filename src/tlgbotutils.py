@@ -10,9 +10,9 @@ Author:
 Creation date:
     02/11/2020
 Last modified date:
-    22/02/2026
+    18/10/2026
 Version:
-    1.3.0
+    1.4.0
 '''
 
 ###############################################################################
@@ -22,8 +22,27 @@ Version:
 # Logging Library
 import logging
 
+# Asynchronous Input-Output Concurrency Library
+from asyncio import Event as AsyncEvent
+from asyncio import Lock as AsyncLock
+from asyncio import Semaphore as AsyncSemaphore
+from asyncio import ensure_future as asyncio_ensure_future
+from asyncio import get_running_loop as asyncio_get_running_loop
+from asyncio import shield as asyncio_shield
+from asyncio import sleep as asyncio_sleep
+from asyncio import wait_for as asyncio_wait_for
+
+# Collections Data Types Library
+from collections import deque
+
 # Date and Time Library
-from datetime import datetime
+from datetime import datetime, timedelta
+
+# System Library
+from sys import maxsize as sys_maxsize
+
+# Time Library
+from time import monotonic
 
 # Data Types Library
 from typing import List, Optional, Union
@@ -42,11 +61,13 @@ from telegram import (
 
 # Python-Telegram_Bot Extension Library
 from telegram.ext import (
-    CommandHandler
+    BaseUpdateProcessor, CommandHandler
 )
 
 # Python-Telegram_Bot Errors Library
-from telegram.error import TelegramError
+from telegram.error import (
+    BadRequest, NetworkError, RetryAfter, TelegramError
+)
 
 # Python-Telegram_Bot Constants Data Parsing Library
 from telegram.constants import ParseMode
@@ -81,6 +102,559 @@ logger = logging.getLogger(__name__)
 
 ANONYMOUS_ADMIN_ID = 1087968824
 
+# Maximum number of messages that can be deleted in a single request
+MAX_DELETE_MSGS = 100
+
+# Maximum length of a text message
+TLG_MAX_MSG_LEN = 4096
+
+# Bot API requests priorities (lower value, higher priority)
+TLG_PRIORITY_HIGH = 0
+TLG_PRIORITY_NORMAL = 1
+TLG_PRIORITY_LOW = 2
+
+
+###############################################################################
+# Chat Administrators Cache
+###############################################################################
+
+class ChatAdminsCache():
+    '''Chat Administrators lists cache data.'''
+    # Time to live of cached Administrators lists (in seconds)
+    ttl: float = 300
+    # Number of cached chats that triggers a purge of expired lists
+    purge_size: int = 10000
+    # Chat ID -> (expiration time, Administrators list)
+    admins: dict = {}
+    # Chat ID -> Administrators list in progress API request
+    requests: dict = {}
+    # Chat ID -> Number of times the chat cached data has been discarded
+    generation: dict = {}
+
+
+ChatAdmins = ChatAdminsCache()
+
+
+###############################################################################
+# Bot API Rate Limiter
+###############################################################################
+
+class TokenBucket():
+    '''Token bucket of a rate limit.'''
+    __slots__ = ("rate", "capacity", "tokens", "last_refill", "paused_until")
+
+    def __init__(self, rate: float, capacity: float):
+        '''Constructor.'''
+        # Tokens added per second and maximum tokens (burst)
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = monotonic()
+        # Time until no token is given (requested by Telegram RetryAfter)
+        self.paused_until = 0.0
+
+    def refill(self, now: float):
+        '''Add the tokens generated since last refill.'''
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def wait_time(self, now: float, min_tokens: Optional[float] = 1):
+        '''
+        Get the time to wait until the bucket has the minimum tokens to
+        take one (0 if it has them, or if there is no minimum).
+        '''
+        wait = self.paused_until - now
+        if min_tokens is not None:
+            self.refill(now)
+            if self.tokens < min_tokens:
+                wait = max(wait, (min_tokens - self.tokens) / self.rate)
+        return max(wait, 0.0)
+
+    def is_idle(self, now: float):
+        '''Check if the bucket is full and not paused.'''
+        return (self.wait_time(now) == 0) and (self.tokens >= self.capacity)
+
+
+class ApiRateLimiter():
+    '''
+    Bot API requests rate limiter data.
+    All limited requests take a token of the global bucket, and messages
+    sends also a token of the chat bucket. Requests that can't be done
+    yet wait in a queue of their priority, so higher priority requests
+    are done first when the limits are reached.
+    High priority messages sends (captcha challenges) can take the chat
+    token before it is available, getting the chat bucket into debt (so
+    the other messages of the chat wait longer), until the debt reaches
+    max_chat_debt. Then they wait for the chat tokens too, so a raid
+    gets a bounded burst of challenges and then they are paced to the
+    chat rate limit.
+    '''
+    # Limiter enabled/disabled
+    enabled: bool = True
+    # Global requests bucket (Telegram allows around 30 requests/second)
+    global_bucket: TokenBucket = TokenBucket(30, 30)
+    # Messages per second and burst of each group (Telegram allows
+    # around 20 messages/minute) and private chat (around 1 message/s)
+    group_rate: float = 20 / 60
+    group_burst: float = 3
+    private_rate: float = 1
+    private_burst: float = 1
+    # Chat ID -> Chat messages bucket
+    chats: dict = {}
+    # Number of chat buckets that triggers a purge of the idle ones
+    purge_size: int = 10000
+    # Maximum debt of a chat bucket (in tokens)
+    max_chat_debt: float = 20
+    # Priority -> Queue of waiting requests (future, chat bucket, if the
+    # request takes a chat token, chat tokens needed to take it)
+    waiting: dict = {
+        TLG_PRIORITY_HIGH: deque(),
+        TLG_PRIORITY_NORMAL: deque(),
+        TLG_PRIORITY_LOW: deque()
+    }
+    # Waiting requests dispatcher task and its wake up event
+    dispatcher = None
+    wakeup: Optional[AsyncEvent] = None
+    # Maximum RetryAfter time to wait and retry a request (in seconds)
+    max_retry_after: float = 60
+    # Number of RetryAfter errors received
+    num_retry_after: int = 0
+
+
+RateLimiter = ApiRateLimiter()
+
+
+def tlg_set_rate_limits(global_rate: float, group_rate: float):
+    '''
+    Set the Bot API requests global rate limit (in requests per second)
+    and groups rate limit (in messages per minute). A global rate limit
+    of 0 disables the rate limiter.
+    '''
+    RateLimiter.enabled = global_rate > 0
+    if not RateLimiter.enabled:
+        return
+    RateLimiter.global_bucket = TokenBucket(global_rate, global_rate)
+    if group_rate > 0:
+        RateLimiter.group_rate = group_rate / 60
+    RateLimiter.chats.clear()
+
+
+def tlg_get_rate_limiter_stats():
+    '''Get the rate limiter queues depths and status.'''
+    now = monotonic()
+    paused_chats = 0
+    for bucket in RateLimiter.chats.values():
+        if bucket.paused_until > now:
+            paused_chats = paused_chats + 1
+    return {
+        "waiting_high": len(RateLimiter.waiting[TLG_PRIORITY_HIGH]),
+        "waiting_normal": len(RateLimiter.waiting[TLG_PRIORITY_NORMAL]),
+        "waiting_low": len(RateLimiter.waiting[TLG_PRIORITY_LOW]),
+        "chats": len(RateLimiter.chats),
+        "paused_chats": paused_chats,
+        "retry_after": RateLimiter.num_retry_after
+    }
+
+
+def rate_limiter_chat_bucket(chat_id: Union[str, int]):
+    '''Get (or create) the messages bucket of a chat.'''
+    bucket = RateLimiter.chats.get(chat_id, None)
+    if bucket is not None:
+        return bucket
+    if len(RateLimiter.chats) >= RateLimiter.purge_size:
+        now = monotonic()
+        for idle_chat_id in [
+                key for key, chat_bucket in RateLimiter.chats.items()
+                if chat_bucket.is_idle(now)]:
+            del RateLimiter.chats[idle_chat_id]
+    if isinstance(chat_id, int) and (chat_id > 0):
+        bucket = TokenBucket(
+            RateLimiter.private_rate, RateLimiter.private_burst)
+    else:
+        bucket = TokenBucket(RateLimiter.group_rate, RateLimiter.group_burst)
+    RateLimiter.chats[chat_id] = bucket
+    return bucket
+
+
+def rate_limiter_wait_time(now, chat_bucket, chat_min_tokens):
+    '''Get the time to wait until a request can be done.'''
+    wait = RateLimiter.global_bucket.wait_time(now)
+    if chat_bucket is not None:
+        wait = max(wait, chat_bucket.wait_time(now, chat_min_tokens))
+    return wait
+
+
+def rate_limiter_take(chat_bucket, chat_token):
+    '''Take the tokens of a request.'''
+    RateLimiter.global_bucket.tokens = RateLimiter.global_bucket.tokens - 1
+    if chat_token:
+        chat_bucket.refill(monotonic())
+        chat_bucket.tokens = chat_bucket.tokens - 1
+
+
+async def rate_limiter_dispatch():
+    '''
+    Let the waiting requests go when their tokens are available, in
+    priority order (it ends when there is no more waiting requests).
+    '''
+    while any(RateLimiter.waiting.values()):
+        RateLimiter.wakeup.clear()
+        now = monotonic()
+        next_wait = None
+        for queue in RateLimiter.waiting.values():
+            still_waiting = deque()
+            while queue:
+                request = queue.popleft()
+                future, chat_bucket, chat_token, chat_min_tokens = request
+                if future.done():
+                    continue
+                wait = rate_limiter_wait_time(
+                    now, chat_bucket, chat_min_tokens)
+                if wait <= 0:
+                    rate_limiter_take(chat_bucket, chat_token)
+                    future.set_result(None)
+                    continue
+                still_waiting.append(request)
+                if (next_wait is None) or (wait < next_wait):
+                    next_wait = wait
+                # No global token left, everything else must wait
+                if RateLimiter.global_bucket.wait_time(now) > 0:
+                    break
+            still_waiting.extend(queue)
+            queue.clear()
+            queue.extend(still_waiting)
+        if next_wait is None:
+            continue
+        try:
+            await asyncio_wait_for(RateLimiter.wakeup.wait(), next_wait)
+        except TimeoutError:
+            pass
+    RateLimiter.dispatcher = None
+
+
+async def tlg_rate_limit(
+        chat_id: Union[str, int, None],
+        priority: int = TLG_PRIORITY_NORMAL,
+        chat_token: bool = False):
+    '''
+    Wait until a Bot API request can be done without exceeding the rate
+    limits. The chat_token argument tells if the request is a message
+    send that counts for the chat messages rate limit (high priority
+    requests can take the chat token in advance, up to max_chat_debt).
+    '''
+    if not RateLimiter.enabled:
+        return
+    chat_bucket = None
+    if chat_id is not None:
+        chat_bucket = rate_limiter_chat_bucket(chat_id)
+    chat_min_tokens = None
+    if chat_token:
+        chat_min_tokens = 1
+        if priority == TLG_PRIORITY_HIGH:
+            chat_min_tokens = 1 - RateLimiter.max_chat_debt
+    # Go ahead if nothing is waiting and tokens are available
+    if not any(RateLimiter.waiting.values()):
+        wait = rate_limiter_wait_time(
+            monotonic(), chat_bucket, chat_min_tokens)
+        if wait <= 0:
+            rate_limiter_take(chat_bucket, chat_token)
+            return
+    future = asyncio_get_running_loop().create_future()
+    RateLimiter.waiting[priority].append(
+        (future, chat_bucket, chat_token, chat_min_tokens))
+    if RateLimiter.dispatcher is None:
+        RateLimiter.wakeup = AsyncEvent()
+        RateLimiter.dispatcher = asyncio_ensure_future(
+            rate_limiter_dispatch())
+    else:
+        RateLimiter.wakeup.set()
+    await future
+
+
+def tlg_rate_limit_pause(chat_id: Union[str, int, None], seconds: float):
+    '''
+    Stop requests to a chat (or all requests if no chat is specified)
+    for the specified time, as requested by a Telegram RetryAfter.
+    '''
+    RateLimiter.num_retry_after = RateLimiter.num_retry_after + 1
+    bucket = RateLimiter.global_bucket
+    if chat_id is not None:
+        bucket = rate_limiter_chat_bucket(chat_id)
+    bucket.paused_until = max(bucket.paused_until, monotonic() + seconds)
+    if RateLimiter.wakeup is not None:
+        RateLimiter.wakeup.set()
+
+
+async def tlg_api_request(
+        chat_id: Union[str, int, None],
+        priority: int,
+        chat_token: bool,
+        api_method,
+        /,
+        **kwargs):
+    '''
+    Do a Bot API request respecting the rate limits. If Telegram asks
+    to retry after some time, the chat requests are paused for that time
+    and the request is done again (unless the time is too long).
+    '''
+    while True:
+        await tlg_rate_limit(chat_id, priority, chat_token)
+        try:
+            return await api_method(**kwargs)
+        except RetryAfter as error:
+            retry_after = error.retry_after
+            if isinstance(retry_after, timedelta):
+                retry_after = retry_after.total_seconds()
+            tlg_rate_limit_pause(chat_id, retry_after)
+            if (not RateLimiter.enabled) or \
+                    (retry_after > RateLimiter.max_retry_after):
+                raise
+            logger.warning("[%s] Flood control, retry request in %ss",
+                           str(chat_id), str(retry_after))
+
+
+###############################################################################
+# Chat Members Actions Queue
+###############################################################################
+
+class MemberAction():
+    '''Chat member restriction, kick or ban pending request.'''
+    __slots__ = ("chat_id", "user_key", "api_method", "kwargs", "future")
+
+    def __init__(self, chat_id, user_key, api_method, kwargs, future):
+        '''Constructor.'''
+        self.chat_id = chat_id
+        # (Chat ID, User ID) if the action can be replaced by a later
+        # action of the same user, None otherwise
+        self.user_key = user_key
+        self.api_method = api_method
+        self.kwargs = kwargs
+        self.future = future
+
+
+class MemberActionsQueue():
+    '''
+    Chat members actions work queue data.
+    The actions are run by a set of workers with the high priority of
+    the rate limiter, retrying them on network errors. A pending
+    permissions change of a user is dropped if a new permissions change
+    of that user is requested before it is run.
+    '''
+    # Maximum number of actions run at the same time
+    num_workers: int = 8
+    num_running: int = 0
+    # Maximum attempts of an action that fails by network errors, and
+    # time to wait before first retry (doubled in each retry)
+    max_attempts: int = 5
+    retry_backoff: float = 1
+    # Actions waiting to be run (in request order)
+    queue: deque = deque()
+    # (Chat ID, User ID) -> Waiting permissions change action
+    pending: dict = {}
+    # Number of dropped obsolete actions and retried actions
+    num_dropped: int = 0
+    num_retries: int = 0
+
+
+MemberActions = MemberActionsQueue()
+
+
+def tlg_get_member_actions_stats():
+    '''Get the chat members actions queue status.'''
+    return {
+        "waiting": len(MemberActions.queue),
+        "running": MemberActions.num_running,
+        "dropped": MemberActions.num_dropped,
+        "retries": MemberActions.num_retries
+    }
+
+
+async def member_action_run(action: MemberAction):
+    '''Run a chat member action, retrying it on network errors.'''
+    backoff = MemberActions.retry_backoff
+    attempt = 1
+    while True:
+        try:
+            return await tlg_api_request(
+                action.chat_id, TLG_PRIORITY_HIGH, False, action.api_method,
+                **action.kwargs)
+        except NetworkError as error:
+            if isinstance(error, BadRequest) or \
+                    (attempt >= MemberActions.max_attempts):
+                raise
+            logger.warning("[%s] %s, retrying member action in %ss",
+                           str(action.chat_id), str(error), str(backoff))
+            MemberActions.num_retries = MemberActions.num_retries + 1
+            await asyncio_sleep(backoff)
+            backoff = backoff * 2
+            attempt = attempt + 1
+
+
+async def member_actions_worker():
+    '''Run the queued chat members actions until the queue is empty.'''
+    try:
+        while MemberActions.queue:
+            action = MemberActions.queue.popleft()
+            if action.user_key is not None:
+                if MemberActions.pending.get(action.user_key) is action:
+                    del MemberActions.pending[action.user_key]
+            if action.future.done():
+                continue
+            try:
+                result = await member_action_run(action)
+                if not action.future.done():
+                    action.future.set_result(result)
+            except Exception as error:
+                if not action.future.done():
+                    action.future.set_exception(error)
+    finally:
+        MemberActions.num_running = MemberActions.num_running - 1
+
+
+async def tlg_member_action(
+        chat_id: Union[str, int],
+        user_id: Union[str, int, None],
+        api_method,
+        /,
+        **kwargs):
+    '''
+    Queue a chat member action (Bot API request) and wait for its
+    result. If an user ID is provided, the action is a permissions
+    change that replaces any waiting permissions change of that user,
+    and the replaced one returns True without being run.
+    '''
+    future = asyncio_get_running_loop().create_future()
+    user_key = None
+    if user_id is not None:
+        user_key = (chat_id, user_id)
+        obsolete = MemberActions.pending.get(user_key, None)
+        if (obsolete is not None) and (not obsolete.future.done()):
+            obsolete.future.set_result(True)
+            MemberActions.num_dropped = MemberActions.num_dropped + 1
+    action = MemberAction(chat_id, user_key, api_method, kwargs, future)
+    if user_key is not None:
+        MemberActions.pending[user_key] = action
+    MemberActions.queue.append(action)
+    if MemberActions.num_running < MemberActions.num_workers:
+        MemberActions.num_running = MemberActions.num_running + 1
+        asyncio_ensure_future(member_actions_worker())
+    return await future
+
+
+###############################################################################
+# Updates Processor
+###############################################################################
+
+class ChatUpdatesQueue():
+    '''Chat updates in process data.'''
+    __slots__ = ("lock", "pending")
+
+    def __init__(self):
+        '''Constructor.'''
+        # Lock that keeps the chat updates processed one by one and in
+        # the same order they were received
+        self.lock = AsyncLock()
+        # Number of chat updates waiting or in process
+        self.pending = 0
+
+
+class ChatUpdateProcessor(BaseUpdateProcessor):
+    '''
+    Updates processor that handles updates of different chats
+    concurrently (up to max_concurrent_updates at the same time), but
+    the updates of the same chat serially and in order.
+    If a chat has max_chat_pending_updates waiting to be processed, new
+    updates of that chat that can be shed (as told by the shed_resolver
+    function) are discarded, the other ones are always processed.
+    Updates without an associated chat are processed concurrently with
+    no order.
+    Note: The base class concurrency limit is held while an update waits
+    for its chat turn, so it is not used (updates of a busy chat would
+    block other chats), the limit is applied by this class once the
+    update turn arrives.
+    '''
+
+    def __init__(
+            self,
+            max_concurrent_updates: int,
+            max_chat_pending_updates: int,
+            chat_key_resolver=None,
+            shed_resolver=None):
+        '''Constructor.'''
+        super().__init__(sys_maxsize)
+        self.semaphore = AsyncSemaphore(max_concurrent_updates)
+        self.max_chat_pending_updates = max_chat_pending_updates
+        # Function to get the chat key of an update (None if the update
+        # doesn't belong to any chat)
+        self.chat_key_resolver = chat_key_resolver
+        if self.chat_key_resolver is None:
+            self.chat_key_resolver = tlg_get_update_chat_id
+        # Function to check if an update can be discarded when its chat
+        # has too many pending updates (None to never discard updates)
+        self.shed_resolver = shed_resolver
+        # Chat key -> Chat updates in process data
+        self.chats: dict = {}
+        self.discarded_updates = 0
+
+    def can_shed_update(self, update):
+        '''Check if an update can be discarded.'''
+        if self.shed_resolver is None:
+            return False
+        try:
+            return self.shed_resolver(update)
+        except Exception as error:
+            logger.error("Fail to check update shedding: %s", str(error))
+        return False
+
+    async def do_process_update(self, update, coroutine):
+        '''
+        Process an update once all previous updates of its chat have
+        been processed (the chat lock is acquired before the concurrency
+        limit, so waiting updates of a busy chat doesn't hold it).
+        '''
+        chat_key = None
+        if isinstance(update, Update):
+            try:
+                chat_key = self.chat_key_resolver(update)
+            except Exception as error:
+                logger.error("Fail to get update chat: %s", str(error))
+        if chat_key is None:
+            async with self.semaphore:
+                await coroutine
+            return
+        chat = self.chats.get(chat_key, None)
+        if chat is None:
+            chat = ChatUpdatesQueue()
+            self.chats[chat_key] = chat
+        if (chat.pending >= self.max_chat_pending_updates) and \
+                self.can_shed_update(update):
+            coroutine.close()
+            self.discarded_updates = self.discarded_updates + 1
+            logger.warning("[%s] Too many pending updates, update %s "
+                           "discarded", chat_key, update.update_id)
+            return
+        chat.pending = chat.pending + 1
+        try:
+            async with chat.lock:
+                async with self.semaphore:
+                    await coroutine
+        finally:
+            chat.pending = chat.pending - 1
+            if chat.pending == 0:
+                del self.chats[chat_key]
+
+    async def initialize(self):
+        '''Initialize the processor (nothing to do).'''
+
+    async def shutdown(self):
+        '''Shutdown the processor (nothing to do).'''
+
+    def get_pending_updates(self):
+        '''Get the number of chats and updates waiting or in process.'''
+        num_updates = sum(chat.pending for chat in self.chats.values())
+        return len(self.chats), num_updates
+
 
 ###############################################################################
 # Functions
@@ -161,7 +735,8 @@ async def tlg_send_msg(
         disable_notification: DVInput[bool] = DEFAULT_NONE,
         reply_to_message_id: Optional[int] = None,
         reply_markup: Optional[ReplyMarkup] = None,
-        topic_id: Optional[int] = None):
+        topic_id: Optional[int] = None,
+        priority: int = TLG_PRIORITY_NORMAL):
     '''Bot try to send a text message.'''
     sent_result: dict = {}
     sent_result["msg"] = None
@@ -171,7 +746,8 @@ async def tlg_send_msg(
     elif parse_mode == "MARKDOWN":
         parse_mode = ParseMode.MARKDOWN_V2
     try:
-        msg = await bot.send_message(
+        msg = await tlg_api_request(
+            chat_id, priority, True, bot.send_message,
             chat_id=chat_id, text=text, parse_mode=parse_mode,
             reply_markup=reply_markup,
             disable_web_page_preview=disable_web_page_preview,
@@ -196,13 +772,15 @@ async def tlg_send_image(
         reply_markup: Optional[ReplyMarkup] = None,
         parse_mode: ODVInput[str] = DEFAULT_NONE,
         topic_id: Optional[int] = None,
+        priority: int = TLG_PRIORITY_NORMAL,
         **kwargs):
     '''Bot try to send an image message.'''
     sent_result: dict = {}
     sent_result["msg"] = None
     sent_result["error"] = ""
     try:
-        msg = await bot.send_photo(
+        msg = await tlg_api_request(
+            chat_id, priority, True, bot.send_photo,
             chat_id=chat_id, photo=photo, caption=caption,
             disable_notification=disable_notification,
             reply_to_message_id=reply_to_message_id,
@@ -228,13 +806,15 @@ async def tlg_send_video(
         reply_markup: Optional[ReplyMarkup] = None,
         parse_mode: ODVInput[str] = DEFAULT_NONE,
         topic_id: Optional[int] = None,
+        priority: int = TLG_PRIORITY_NORMAL,
         **kwargs):
     '''Bot try to send an image message.'''
     sent_result: dict = {}
     sent_result["msg"] = None
     sent_result["error"] = ""
     try:
-        msg = await bot.send_video(
+        msg = await tlg_api_request(
+            chat_id, priority, True, bot.send_video,
             chat_id=chat_id, video=video, caption=caption,
             disable_notification=disable_notification,
             reply_to_message_id=reply_to_message_id,
@@ -268,13 +848,15 @@ async def tlg_send_poll(
         explanation_parse_mode: ODVInput[str] = DEFAULT_NONE,
         close_date: Optional[Union[int, datetime]] = None,
         topic_id: Optional[int] = None,
+        priority: int = TLG_PRIORITY_NORMAL,
         **kwargs):
     '''Bot try to send a Poll message'''
     sent_result: dict = {}
     sent_result["msg"] = None
     sent_result["error"] = ""
     try:
-        msg = await bot.send_poll(
+        msg = await tlg_api_request(
+            chat_id, priority, True, bot.send_poll,
             chat_id=chat_id, question=question, options=options,
             is_anonymous=is_anonymous, type=poll_type,
             allows_multiple_answers=allows_multiple_answers,
@@ -304,7 +886,8 @@ async def tlg_stop_poll(
     result["msg"] = None
     result["error"] = ""
     try:
-        result["msg"] = await bot.stop_poll(
+        result["msg"] = await tlg_api_request(
+            chat_id, TLG_PRIORITY_NORMAL, False, bot.stop_poll,
             chat_id=chat_id, message_id=message_id,
             reply_markup=reply_markup, **kwargs)
         logger.debug("[%s] TLG poll %d stop", str(chat_id), message_id)
@@ -317,14 +900,17 @@ async def tlg_stop_poll(
 async def tlg_delete_msg(
         bot: Bot,
         chat_id: Union[int, str],
-        msg_id: int):
+        msg_id: int,
+        priority: int = TLG_PRIORITY_LOW):
     '''Try to remove a telegram message'''
     delete_result: dict = {}
     delete_result["error"] = ""
     if msg_id is not None:
         logger.debug("[%s] TLG deleting msg %d", chat_id, msg_id)
         try:
-            await bot.delete_message(chat_id=chat_id, message_id=msg_id)
+            await tlg_api_request(
+                chat_id, priority, False, bot.delete_message,
+                chat_id=chat_id, message_id=msg_id)
             logger.debug("[%s] TLG msg %d deleted", str(chat_id), msg_id)
         except Exception as error:
             delete_result["error"] = str(error)
@@ -332,6 +918,48 @@ async def tlg_delete_msg(
     return delete_result
 
 
+async def tlg_delete_msgs(
+        bot: Bot,
+        chat_id: Union[int, str],
+        msg_ids: List[int],
+        priority: int = TLG_PRIORITY_LOW):
+    '''
+    Try to remove a list of telegram messages of a chat, with a request
+    for each group of up to 100 messages. If a group removal fails, each
+    message of the group is removed individually to know which ones
+    can't be removed.
+    '''
+    delete_result: dict = {}
+    delete_result["error"] = ""
+    # Message ID -> Error of messages that couldn't be removed
+    delete_result["failed"] = {}
+    msg_ids = list(dict.fromkeys(
+        msg_id for msg_id in msg_ids if msg_id is not None))
+    # Number of messages requested to be removed (without duplicates)
+    delete_result["num_msgs"] = len(msg_ids)
+    for i in range(0, len(msg_ids), MAX_DELETE_MSGS):
+        chunk = msg_ids[i:i + MAX_DELETE_MSGS]
+        if len(chunk) > 1:
+            logger.debug("[%s] TLG deleting %d msgs", chat_id, len(chunk))
+            try:
+                await tlg_api_request(
+                    chat_id, priority, False, bot.delete_messages,
+                    chat_id=chat_id, message_ids=chunk)
+                logger.debug("[%s] TLG %d msgs deleted",
+                             str(chat_id), len(chunk))
+                continue
+            except Exception as error:
+                logger.debug("[%s] TLG fail to delete %d msgs (%s), "
+                             "deleting them one by one",
+                             str(chat_id), len(chunk), str(error))
+        for msg_id in chunk:
+            result = await tlg_delete_msg(bot, chat_id, msg_id, priority)
+            if result["error"] != "":
+                delete_result["error"] = result["error"]
+                delete_result["failed"][msg_id] = result["error"]
+    return delete_result
+
+
 async def tlg_edit_msg_media(
         bot: Bot,
         chat_id: Union[int, str],
@@ -343,7 +971,8 @@ async def tlg_edit_msg_media(
     edit_result: dict = {}
     edit_result["error"] = ""
     try:
-        await bot.edit_message_media(
+        await tlg_api_request(
+            chat_id, TLG_PRIORITY_HIGH, False, bot.edit_message_media,
             chat_id=chat_id, message_id=msg_id,
             inline_message_id=inline_msg_id, media=media,
             reply_markup=reply_markup)
@@ -364,7 +993,8 @@ async def tlg_answer_callback_query(
     query_ans_result: dict = {}
     query_ans_result["error"] = ""
     try:
-        await bot.answer_callback_query(
+        await tlg_api_request(
+            None, TLG_PRIORITY_HIGH, False, bot.answer_callback_query,
             callback_query_id=query.id, text=text, show_alert=show_alert,
             url=url,
             cache_time=cache_time)
@@ -397,9 +1027,12 @@ async def tlg_ban_user(
     # Ban User
     try:
         if until_date is None:
-            await bot.ban_chat_member(chat_id=chat_id, user_id=user_id)
+            await tlg_member_action(
+                chat_id, None, bot.ban_chat_member,
+                chat_id=chat_id, user_id=user_id)
         else:
-            await bot.ban_chat_member(
+            await tlg_member_action(
+                chat_id, None, bot.ban_chat_member,
                 chat_id=chat_id, user_id=user_id, until_date=until_date)
     except Exception as error:
         ban_result["error"] = str(error)
@@ -429,7 +1062,8 @@ async def tlg_kick_user(
     # Kick User (remove restrictions with only_if_banned=False make
     # it kick)
     try:
-        await bot.unban_chat_member(
+        await tlg_member_action(
+            chat_id, None, bot.unban_chat_member,
             chat_id=chat_id, user_id=user_id, only_if_banned=False)
     except Exception as error:
         kick_result["error"] = str(error)
@@ -472,10 +1106,12 @@ async def tlg_restrict_user(
             insert_links, change_group_info, invite_members, pin_messages,
             manage_topics)
         if until_date is None:
-            result = await bot.restrict_chat_member(
+            result = await tlg_member_action(
+                chat_id, user_id, bot.restrict_chat_member,
                 chat_id=chat_id, user_id=user_id, permissions=permissions)
         else:
-            result = await bot.restrict_chat_member(
+            result = await tlg_member_action(
+                chat_id, user_id, bot.restrict_chat_member,
                 chat_id=chat_id, user_id=user_id, permissions=permissions,
                 until_date=until_date)
     except Exception as error:
@@ -493,7 +1129,8 @@ async def tlg_unrestrict_user(
     try:
         permissions = ChatPermissions(
             True, True, True, True, True, True, True, True)
-        result = await bot.restrict_chat_member(
+        result = await tlg_member_action(
+            chat_id, user_id, bot.restrict_chat_member,
             chat_id=chat_id, user_id=user_id, permissions=permissions)
     except Exception as error:
         logger.error("[%s] %s", str(chat_id), str(error))
@@ -501,6 +1138,72 @@ async def tlg_unrestrict_user(
     return result
 
 
+def tlg_set_chat_admins_cache_ttl(ttl: float):
+    '''Set the time to live of the chats Administrators cache.'''
+    ChatAdmins.ttl = ttl
+
+
+def tlg_invalidate_chat_admins(chat_id: Union[str, int]):
+    '''
+    Discard the cached Administrators list of a chat (i.e. when a member
+    has been promoted or demoted), so it is requested again in the next
+    access.
+    '''
+    ChatAdmins.admins.pop(chat_id, None)
+    ChatAdmins.requests.pop(chat_id, None)
+    ChatAdmins.generation[chat_id] = ChatAdmins.generation.get(chat_id, 0) + 1
+
+
+async def tlg_request_chat_admins(
+        bot: Bot,
+        chat_id: Union[str, int]):
+    '''Request the Administrators list of a chat and cache it.'''
+    generation = ChatAdmins.generation.get(chat_id, 0)
+    try:
+        group_admins = await bot.get_chat_administrators(chat_id=chat_id)
+    except Exception as error:
+        logger.error("[%s] %s", str(chat_id), str(error))
+        return None
+    finally:
+        if ChatAdmins.generation.get(chat_id, 0) == generation:
+            ChatAdmins.requests.pop(chat_id, None)
+    # Don't cache the list if it was invalidated during the request
+    if ChatAdmins.generation.get(chat_id, 0) != generation:
+        return group_admins
+    _t0 = monotonic()
+    if len(ChatAdmins.admins) >= ChatAdmins.purge_size:
+        for expired_chat_id in [
+                cached_chat_id
+                for cached_chat_id, (expire_time, _) in
+                ChatAdmins.admins.items() if expire_time <= _t0]:
+            del ChatAdmins.admins[expired_chat_id]
+    ChatAdmins.admins[chat_id] = (_t0 + ChatAdmins.ttl, group_admins)
+    return group_admins
+
+
+async def tlg_get_chat_admins_members(
+        bot: Bot,
+        chat_id: Union[str, int]):
+    '''
+    Get the Administrators (ChatMember objects) of a group. The list is
+    cached for each chat during the configured time to live, and
+    concurrent requests for the same chat share a single API request.
+    Returns None if the Administrators can't be get.
+    '''
+    cached_admins = ChatAdmins.admins.get(chat_id, None)
+    if cached_admins is not None:
+        expire_time, group_admins = cached_admins
+        if monotonic() < expire_time:
+            return group_admins
+    request = ChatAdmins.requests.get(chat_id, None)
+    if request is None:
+        request = asyncio_ensure_future(tlg_request_chat_admins(bot, chat_id))
+        ChatAdmins.requests[chat_id] = request
+    # Shield the shared request to avoid a cancelled caller to cancel it
+    # for every other caller
+    return await asyncio_shield(request)
+
+
 async def tlg_user_is_admin(
         bot: Bot,
         chat_id: Union[str, int],
@@ -511,10 +1214,8 @@ async def tlg_user_is_admin(
     if user_id == ANONYMOUS_ADMIN_ID:
         return True
     # Get group Admins
-    try:
-        group_admins = await bot.get_chat_administrators(chat_id=chat_id)
-    except Exception as error:
-        logger.error("[%s] %s", str(chat_id), str(error))
+    group_admins = await tlg_get_chat_admins_members(bot, chat_id)
+    if group_admins is None:
         return None
     # Check if the user is one of the group Admins
     for admin in group_admins:
@@ -523,6 +1224,19 @@ async def tlg_user_is_admin(
     return False
 
 
+def tlg_member_admin_status_change(chat_member_update: ChatMemberUpdated):
+    '''
+    Check if a chat member status change implies a change in the group
+    Administrators list (member promoted or demoted).
+    '''
+    admin_status = [ChatMember.OWNER, ChatMember.ADMINISTRATOR]
+    old_status = chat_member_update.old_chat_member.status
+    new_status = chat_member_update.new_chat_member.status
+    if old_status == new_status:
+        return False
+    return (old_status in admin_status) or (new_status in admin_status)
+
+
 def tlg_is_a_channel_msg_on_discussion_group(msg: Message):
     '''Check if a Telegram message is a channel publish send to linked
     discussion group of that group.'''
@@ -675,6 +1389,13 @@ def tlg_member_has_left_group(chat_member: ChatMemberUpdated):
     return True
 
 
+def tlg_get_update_chat_id(update: Update):
+    '''Get the ID of the chat of an update (None if it has no chat).'''
+    if update.effective_chat is None:
+        return None
+    return update.effective_chat.id
+
+
 def tlg_get_msg(update: Update):
     '''Get Telegram message data from the Update element.'''
     msg = getattr(update, "message", None)
@@ -693,10 +1414,8 @@ async def tlg_get_chat_admins(
         ignore_bots: bool = True):
     '''Get a list of all group/channel Administrators.'''
     list_admins = list()
-    try:
-        group_admins = await bot.get_chat_administrators(chat_id)
-    except Exception as error:
-        logger.error("[%s] %s", str(chat_id), str(error))
+    group_admins = await tlg_get_chat_admins_members(bot, chat_id)
+    if group_admins is None:
         return list_admins
     for admin in group_admins:
         if ignore_bots and admin.user.is_bot:
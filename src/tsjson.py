@@ -10,9 +10,9 @@ Author:
 Creation date:
     20/07/2017
 Last modified date:
-    30/12/2022
+    18/10/2026
 Version:
-    1.3.0
+    1.4.0
 '''
 
 ###############################################################################
@@ -23,20 +23,28 @@ Version:
 import logging
 
 # Operating System Library
+from os import fchmod as os_fchmod
+from os import fsync as os_fsync
 from os import makedirs as os_makedirs
 from os import path as os_path
 from os import remove as os_remove
+from os import replace as os_replace
 from os import stat as os_stat
+from os import umask as os_umask
 
 # JSON Library
-from json import dump as json_dump
+from json import dumps as json_dumps
 from json import load as json_load
+from json import loads as json_loads
 
 # Collections Data Types Library
 from collections import OrderedDict
 
+# Temporary Files Library
+from tempfile import NamedTemporaryFile
+
 # Threads and Multi-tasks Library
-from threading import Lock
+from threading import Condition, Lock, Thread
 
 # Error Traceback Library
 from traceback import format_exc
@@ -49,6 +57,18 @@ from traceback import format_exc
 logger = logging.getLogger(__name__)
 
 
+###############################################################################
+# Constants
+###############################################################################
+
+# Process file mode creation mask (it can just be read by setting it)
+FILE_UMASK = os_umask(0o022)
+os_umask(FILE_UMASK)
+
+# Mode of new JSON files
+NEW_FILE_MODE = 0o666 & ~FILE_UMASK
+
+
 ###############################################################################
 # Thread-Safe JSON Class
 ###############################################################################
@@ -58,13 +78,16 @@ class TSjson():
     Thread-Safe JSON files read/write class.
     '''
 
-    def __init__(self, file_name):
+    def __init__(self, file_name, writer=None):
         '''
         Class Constructor.
         It initializes the Mutex Lock element and get the file path.
+        Optionally, a background writer (TSjsonWriter) can be provided
+        to be used by write_async().
         '''
         self.lock = Lock()
         self.file_name = file_name
+        self.writer = writer
 
     def read(self):
         '''
@@ -76,6 +99,11 @@ class TSjson():
         returned. If the process fails, it returns None.
         '''
         read = {}
+        # Get the data pending to be written by the background writer
+        if self.writer is not None:
+            pending_data = self.writer.get_pending(self.file_name)
+            if pending_data is not None:
+                return json_loads(pending_data, object_pairs_hook=OrderedDict)
         # Try to read the file
         try:
             with self.lock:
@@ -96,26 +124,83 @@ class TSjson():
     def write(self, data):
         '''
         Thread-Safe Write of JSON file.
+        It serializes the provided JSON data and writes it to the file
+        (see write_str()).
+        '''
+        if not data:
+            return False
+        try:
+            data_str = json_dumps(data, ensure_ascii=False, indent=4)
+        except Exception:
+            logger.error(format_exc())
+            logger.error("Fail to serialize JSON data of %s", self.file_name)
+            return False
+        return self.write_str(data_str)
+
+    def write_async(self, data):
+        '''
+        Non-blocking Write of JSON file.
+        It serializes the provided JSON data (without indentation) and
+        request the background writer to write it to the file, so
+        successive writes of the file are coalesced into just the last
+        one. If there is no running background writer, the file is
+        written right now.
+        '''
+        if not data:
+            return False
+        if (self.writer is None) or (not self.writer.is_running()):
+            return self.write(data)
+        try:
+            data_str = json_dumps(data, ensure_ascii=False)
+        except Exception:
+            logger.error(format_exc())
+            logger.error("Fail to serialize JSON data of %s", self.file_name)
+            return False
+        self.writer.put(self, data_str)
+        return True
+
+    def write_str(self, data_str):
+        '''
+        Thread-Safe atomic Write of JSON file.
         It checks and creates all the needed directories to file path if
         any does not exists. Then it locks the Mutex access to the file,
-        opens and overwrites the file with the provided JSON data.
+        writes the serialized JSON data to a temporary file in the same
+        directory and replaces the file with it, so the file is never
+        left half-written. The temporary file gets the permissions of
+        the replaced file (or the default ones of a new file), and it is
+        synced to disk before the replace, so the write survives power
+        losses.
         '''
         write_result_ok = False
-        if not data:
-            return False
         # Check for directory path and create all needed directories
         directory = os_path.dirname(self.file_name)
-        if not os_path.exists(directory):
-            os_makedirs(directory)
+        if directory and not os_path.exists(directory):
+            os_makedirs(directory, exist_ok=True)
         # Try to write the file
+        tmp_file_name = None
         try:
             with self.lock:
-                with open(self.file_name, "w", encoding="utf-8") as file:
-                    json_dump(data, fp=file, ensure_ascii=False, indent=4)
+                with NamedTemporaryFile(
+                        "w", encoding="utf-8", dir=directory or None,
+                        prefix=f"{os_path.basename(self.file_name)}.",
+                        suffix=".tmp", delete=False) as file:
+                    tmp_file_name = file.name
+                    file.write(data_str)
+                    file.flush()
+                    file_mode = NEW_FILE_MODE
+                    if os_path.exists(self.file_name):
+                        file_mode = os_stat(self.file_name).st_mode & 0o7777
+                    os_fchmod(file.fileno(), file_mode)
+                    os_fsync(file.fileno())
+                os_replace(tmp_file_name, self.file_name)
+                tmp_file_name = None
                 write_result_ok = True
         except Exception:
             logger.error(format_exc())
             logger.error("Fail to write JSON file %s", self.file_name)
+        finally:
+            if tmp_file_name is not None and os_path.exists(tmp_file_name):
+                os_remove(tmp_file_name)
         return write_result_ok
 
     def delete(self):
@@ -132,3 +217,93 @@ class TSjson():
             logger.error(format_exc())
             logger.error("Fail to remove JSON file %s", self.file_name)
         return remove_ok
+
+
+###############################################################################
+# JSON Files Background Writer Class
+###############################################################################
+
+class TSjsonWriter():
+    '''
+    Background thread that writes the JSON files requested by
+    TSjson.write_async(). If a file is requested to be written again
+    before the previous write has been done, just the last data is
+    written.
+    '''
+
+    def __init__(self):
+        '''
+        Class Constructor.
+        '''
+        self.cond = Condition()
+        self.pending = {}
+        self.thread = None
+        self.running = False
+
+    def is_running(self):
+        '''
+        Check if the writer thread is running.
+        '''
+        return self.running
+
+    def start(self):
+        '''
+        Launch the writer thread.
+        '''
+        if self.running:
+            return
+        self.running = True
+        self.thread = Thread(target=self.run, name="TSjsonWriter",
+                             daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        '''
+        Write all pending files and stop the writer thread.
+        '''
+        if not self.running:
+            return
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        self.thread.join()
+        self.thread = None
+
+    def put(self, tsjson, data_str):
+        '''
+        Request to write serialized JSON data to a file.
+        '''
+        with self.cond:
+            self.pending[tsjson.file_name] = (tsjson, data_str)
+            self.cond.notify_all()
+
+    def get_pending(self, file_name):
+        '''
+        Get the serialized JSON data that is pending to be written to a
+        file (None if there is nothing pending).
+        '''
+        with self.cond:
+            pending = self.pending.get(file_name, None)
+        if pending is None:
+            return None
+        return pending[1]
+
+    def run(self):
+        '''
+        Writer thread main loop.
+        Note: Written files are kept as pending until the write finish,
+        so they are always read with the last data.
+        '''
+        while True:
+            with self.cond:
+                while self.running and not self.pending:
+                    self.cond.wait()
+                if not self.pending:
+                    return
+                to_write = list(self.pending.values())
+            for pending in to_write:
+                tsjson, data_str = pending
+                tsjson.write_str(data_str)
+                with self.cond:
+                    if self.pending.get(tsjson.file_name) is pending:
+                        del self.pending[tsjson.file_name]
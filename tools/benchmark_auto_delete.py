@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script:
+    benchmark_auto_delete.py
+Description:
+    Measure the memory usage and the schedule and delete throughput of
+    a large number of pending messages auto-deletions, stored with the
+    old per-message dicts layout and with the ScheduledDelete records.
+Usage:
+    1. Move this script to src/ directory
+    2. Run the script
+'''
+
+###############################################################################
+# Standard Libraries
+###############################################################################
+
+# Logging Library
+import logging
+
+# Collections Data Types Library
+from collections import OrderedDict
+
+# Priority Queue Library
+from heapq import heappop, heappush
+
+# Iterators Library
+from itertools import count as itertools_count
+
+# Random Library
+from random import randint as random_randint
+
+# System Library
+from sys import argv as sys_argv
+from sys import exit as sys_exit
+
+# Time Library
+from time import perf_counter, time
+
+# Memory Allocations Tracing Library
+import tracemalloc
+
+
+###############################################################################
+# Local Libraries
+###############################################################################
+
+# Captcha Process Data Types Library
+from captchadata import ScheduledDelete
+
+
+###############################################################################
+# Logger Setup
+###############################################################################
+
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+
+logger = logging.getLogger(__name__)
+
+
+###############################################################################
+# Setup
+###############################################################################
+
+# Number of synthetic pending messages deletions
+NUM_MSGS = 100000
+
+# Number of synthetic chats of the messages
+NUM_CHATS = 1000
+
+# First chat ID of the synthetic chats
+FIRST_CHAT_ID = -1001000000000
+
+# Max delete time of the synthetic messages (seconds)
+MAX_DELETE_TIME = 300
+
+
+###############################################################################
+# Functions
+###############################################################################
+
+def dict_schedule(queue, seq, chat_id, msg_id, delete_time):
+    '''
+    Schedule a message deletion with the old dict layout.
+    '''
+    sent_msg_data = OrderedDict(
+        [
+            ("Chat_id", None), ("User_id", None), ("Msg_id", None),
+            ("time", None), ("delete_time", None)
+        ]
+    )
+    sent_msg_data["Chat_id"] = chat_id
+    sent_msg_data["User_id"] = 0
+    sent_msg_data["Msg_id"] = msg_id
+    sent_msg_data["time"] = time()
+    sent_msg_data["delete_time"] = delete_time
+    delete_at = sent_msg_data["time"] + sent_msg_data["delete_time"]
+    heappush(queue, (delete_at, next(seq), sent_msg_data))
+
+
+def dict_pop(queue):
+    '''
+    Get the next message to delete with the old dict layout.
+    '''
+    _, _, sent_msg = heappop(queue)
+    return sent_msg["Chat_id"], sent_msg["Msg_id"]
+
+
+def record_schedule(queue, seq, chat_id, msg_id, delete_time):
+    '''
+    Schedule a message deletion with the ScheduledDelete record.
+    '''
+    heappush(queue, ScheduledDelete(
+        time() + delete_time, next(seq), chat_id, msg_id))
+
+
+def record_pop(queue):
+    '''
+    Get the next message to delete with the ScheduledDelete record.
+    '''
+    sent_msg = heappop(queue)
+    return sent_msg.chat_id, sent_msg.msg_id
+
+
+def benchmark(layout, schedule, pop, msgs):
+    '''
+    Measure the memory and time to schedule all the messages, and the
+    time to get all of them in delete order.
+    '''
+    queue = []
+    seq = itertools_count()
+    tracemalloc.start()
+    _t0 = perf_counter()
+    for chat_id, msg_id, delete_time in msgs:
+        schedule(queue, seq, chat_id, msg_id, delete_time)
+    schedule_s = perf_counter() - _t0
+    memory_mb = tracemalloc.get_traced_memory()[0] / (1024 * 1024)
+    tracemalloc.stop()
+    _t0 = perf_counter()
+    while queue:
+        pop(queue)
+    pop_s = perf_counter() - _t0
+    logger.info("%-16s | %d msgs | memory: %7.2f MB | "
+                "schedule: %7.0f msgs/s | pop: %7.0f msgs/s",
+                layout, NUM_MSGS, memory_mb, NUM_MSGS / schedule_s,
+                NUM_MSGS / pop_s)
+
+
+###############################################################################
+# Main Function
+###############################################################################
+
+def main(argc, argv):
+    '''
+    Main Function.
+    '''
+    # Disable unused arguments
+    del argc
+    del argv
+    msgs = [
+        (FIRST_CHAT_ID - random_randint(0, NUM_CHATS - 1), msg_id,
+         random_randint(1, MAX_DELETE_TIME))
+        for msg_id in range(NUM_MSGS)
+    ]
+    benchmark("Dicts", dict_schedule, dict_pop, msgs)
+    benchmark("ScheduledDelete", record_schedule, record_pop, msgs)
+    return 0
+
+
+###############################################################################
+# Runnable Main Script Detection
+###############################################################################
+
+if __name__ == "__main__":
+    return_code = main(len(sys_argv) - 1, sys_argv[1:])
+    logger.info("Exit (%d)", return_code)
+    sys_exit(return_code)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script:
+    benchmark_config_registry.py
+Description:
+    Measure the cost of get_chat_config_file() lookups as the number of
+    registered chats grows, compared with the old linear list scan.
+Usage:
+    1. Move this script to src/ directory
+    2. Run the script
+'''
+
+###############################################################################
+# Standard Libraries
+###############################################################################
+
+# Logging Library
+import logging
+
+# Collections Data Types Library
+from collections import OrderedDict
+
+# Random Library
+from random import randint as random_randint
+
+# System Library
+from sys import argv as sys_argv
+from sys import exit as sys_exit
+
+# Time Library
+from time import perf_counter
+
+
+###############################################################################
+# Local Libraries
+###############################################################################
+
+# Bot Library
+from join_captcha_bot import Global, get_chat_config_file
+
+# Thread-Safe JSON Library
+from tsjson import TSjson
+
+
+###############################################################################
+# Logger Setup
+###############################################################################
+
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+
+logger = logging.getLogger(__name__)
+
+
+###############################################################################
+# Setup
+###############################################################################
+
+# Number of registered chats to benchmark
+NUM_CHATS = [100, 1000, 10000, 100000]
+
+# Number of lookups to measure for each number of registered chats
+NUM_LOOKUPS = 500
+
+# First chat ID of the synthetic chats
+FIRST_CHAT_ID = -1001000000000
+
+
+###############################################################################
+# Functions
+###############################################################################
+
+def legacy_get_chat_config_file(files_config_list, chat_id):
+    '''
+    Old files config list linear scan lookup (for comparison).
+    '''
+    for chat_file in files_config_list:
+        if chat_file["ID"] == chat_id:
+            return chat_file["File"]
+    file = OrderedDict([("ID", chat_id), ("File", TSjson(str(chat_id)))])
+    files_config_list.append(file)
+    return file["File"]
+
+
+def benchmark(num_chats):
+    '''
+    Register the specified number of chats and measure the mean time of
+    random lookups with the registry and with the old linear scan.
+    '''
+    Global.chat_config_files.clear()
+    files_config_list = []
+    for i in range(num_chats):
+        chat_id = FIRST_CHAT_ID - i
+        # Startup populated chats comes from directory names (strings)
+        get_chat_config_file(str(chat_id))
+        files_config_list.append(
+            OrderedDict([("ID", str(chat_id)), ("File", TSjson(""))]))
+    lookups = [
+        FIRST_CHAT_ID - random_randint(0, num_chats - 1)
+        for _ in range(NUM_LOOKUPS)
+    ]
+    _t0 = perf_counter()
+    for chat_id in lookups:
+        get_chat_config_file(chat_id)
+    registry_us = (perf_counter() - _t0) * 1000000 / NUM_LOOKUPS
+    # Note: old list was populated with directory names, so it has to
+    # be looked up with string IDs to find the registered chats
+    lookups = [str(chat_id) for chat_id in lookups]
+    _t0 = perf_counter()
+    for chat_id in lookups:
+        legacy_get_chat_config_file(files_config_list, chat_id)
+    legacy_us = (perf_counter() - _t0) * 1000000 / NUM_LOOKUPS
+    logger.info("%7d chats | registry: %8.3f us/lookup | "
+                "linear scan: %10.3f us/lookup | registered: %d",
+                num_chats, registry_us, legacy_us,
+                len(Global.chat_config_files))
+
+
+###############################################################################
+# Main Function
+###############################################################################
+
+def main(argc, argv):
+    '''
+    Main Function.
+    '''
+    # Disable unused arguments
+    del argc
+    del argv
+    for num_chats in NUM_CHATS:
+        benchmark(num_chats)
+    return 0
+
+
+###############################################################################
+# Runnable Main Script Detection
+###############################################################################
+
+if __name__ == "__main__":
+    return_code = main(len(sys_argv) - 1, sys_argv[1:])
+    logger.info("Exit (%d)", return_code)
+    sys_exit(return_code)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script:
+    benchmark_pending_users.py
+Description:
+    Measure the memory usage, creation time and session serialization
+    time of a large number of users in captcha process, stored with the
+    old nested dicts layout and with the PendingVerification slotted
+    records.
+Usage:
+    1. Move this script to src/ directory
+    2. Run the script
+'''
+
+###############################################################################
+# Standard Libraries
+###############################################################################
+
+# Logging Library
+import logging
+
+# Persistent RAM data serialization
+from pickle import dumps as pickle_dumps
+
+# System Library
+from sys import argv as sys_argv
+from sys import exit as sys_exit
+
+# Time Library
+from time import perf_counter, time
+
+# Memory Allocations Tracing Library
+import tracemalloc
+
+
+###############################################################################
+# Local Libraries
+###############################################################################
+
+# Captcha Process Data Types Library
+from captchadata import PendingVerification
+
+
+###############################################################################
+# Logger Setup
+###############################################################################
+
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+
+logger = logging.getLogger(__name__)
+
+
+###############################################################################
+# Setup
+###############################################################################
+
+# Number of synthetic users in captcha process
+NUM_USERS = 100000
+
+# Number of synthetic users of each chat
+USERS_PER_CHAT = 10
+
+# First chat ID of the synthetic chats
+FIRST_CHAT_ID = -1001000000000
+
+# First user ID of the synthetic users
+FIRST_USER_ID = 5000000000
+
+
+###############################################################################
+# Functions
+###############################################################################
+
+def new_dict_user(i):
+    '''
+    Create the data of a user with the old nested dicts layout.
+    '''
+    return {
+        "join_data": {
+            "user_name": f"User {i}",
+            "captcha_code": f"{i % 10000:04d}",
+            "captcha_mode": "nums",
+            "join_time": time(),
+            "captcha_timeout": 300,
+            "join_retries": 1,
+            "kicked_ban": False
+        },
+        "join_msg": i * 3,
+        "msg_to_rm": [i * 3 + 1, i * 3 + 2]
+    }
+
+
+def new_slots_user(i):
+    '''
+    Create the data of a user with the PendingVerification record.
+    '''
+    return PendingVerification(
+        f"User {i}", f"{i % 10000:04d}", "nums", 300,
+        join_msg=i * 3, msg_to_rm=(i * 3 + 1, i * 3 + 2))
+
+
+def create_users(new_user):
+    '''
+    Create the synthetic users in captcha process of all chats.
+    '''
+    new_users = {}
+    for i in range(NUM_USERS):
+        chat_id = FIRST_CHAT_ID - (i // USERS_PER_CHAT)
+        new_users.setdefault(chat_id, {})[FIRST_USER_ID + i] = new_user(i)
+    return new_users
+
+
+def benchmark(layout, new_user, encoder=None):
+    '''
+    Measure the memory and creation time of the users, and the time to
+    serialize all of them for the session storage.
+    '''
+    tracemalloc.start()
+    _t0 = perf_counter()
+    new_users = create_users(new_user)
+    create_s = perf_counter() - _t0
+    memory_mb = tracemalloc.get_traced_memory()[0] / (1024 * 1024)
+    tracemalloc.stop()
+    session_bytes = 0
+    _t0 = perf_counter()
+    for chat_users in new_users.values():
+        for user_data in chat_users.values():
+            if encoder is not None:
+                user_data = encoder(user_data)
+            session_bytes = session_bytes + len(pickle_dumps(user_data))
+    serialize_s = perf_counter() - _t0
+    logger.info("%-20s | %d users | memory: %8.2f MB | create: %6.3f s | "
+                "serialize: %6.3f s (%.2f MB)",
+                layout, NUM_USERS, memory_mb, create_s, serialize_s,
+                session_bytes / (1024 * 1024))
+
+
+###############################################################################
+# Main Function
+###############################################################################
+
+def main(argc, argv):
+    '''
+    Main Function.
+    '''
+    # Disable unused arguments
+    del argc
+    del argv
+    benchmark("Nested dicts", new_dict_user)
+    benchmark("PendingVerification", new_slots_user,
+              PendingVerification.to_data)
+    return 0
+
+
+###############################################################################
+# Runnable Main Script Detection
+###############################################################################
+
+if __name__ == "__main__":
+    return_code = main(len(sys_argv) - 1, sys_argv[1:])
+    logger.info("Exit (%d)", return_code)
+    sys_exit(return_code)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script:
+    benchmark_startup.py
+Description:
+    Measure the Bot resources initialization time with large chats
+    directory trees, compared with the old eager scan of all chats
+    directories, and the time to lazy load a chat config on first
+    access.
+Usage:
+    1. Move this script to src/ directory
+    2. Run the script
+'''
+
+###############################################################################
+# Standard Libraries
+###############################################################################
+
+# Logging Library
+import logging
+
+# JSON Library
+from json import dumps as json_dumps
+
+# Operating System Library
+from os import listdir, makedirs, path
+
+# Random Library
+from random import randint as random_randint
+
+# High Level Files Utils Library
+from shutil import rmtree
+
+# System Library
+from sys import argv as sys_argv
+from sys import exit as sys_exit
+
+# Temporary Files Library
+from tempfile import mkdtemp
+
+# Time Library
+from time import perf_counter
+
+
+###############################################################################
+# Local Libraries
+###############################################################################
+
+# Bot Library
+from join_captcha_bot import (
+    CONST, Global, get_chat_config, get_default_config_data,
+    initialize_resources
+)
+
+# Thread-Safe JSON Library
+from tsjson import TSjson
+
+
+###############################################################################
+# Logger Setup
+###############################################################################
+
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+
+logger = logging.getLogger(__name__)
+
+
+###############################################################################
+# Setup
+###############################################################################
+
+# Number of synthetic chats directories to benchmark
+NUM_CHATS = [10000, 100000]
+
+# Percentage of synthetic chats directories without config file
+NO_CONFIG_PERCENT = 1
+
+# Number of chats to measure the first access time
+NUM_LOOKUPS = 500
+
+# First chat ID of the synthetic chats
+FIRST_CHAT_ID = -1001000000000
+
+# URL detection Regex template (it is formatted at initialization)
+REGEX_URLS_TEMPLATE = CONST["REGEX_URLS"]
+
+
+###############################################################################
+# Functions
+###############################################################################
+
+def create_chats_tree(chats_dir, num_chats):
+    '''
+    Create synthetic chats directories with config files.
+    '''
+    config_str = json_dumps(get_default_config_data())
+    for i in range(num_chats):
+        chat_dir = f"{chats_dir}/{FIRST_CHAT_ID - i}"
+        makedirs(chat_dir)
+        if i % 100 < NO_CONFIG_PERCENT:
+            continue
+        with open(f'{chat_dir}/{CONST["F_CONF"]}', "w",
+                  encoding="utf-8") as file:
+            file.write(config_str)
+
+
+def legacy_initialize_chats(chats_dir):
+    '''
+    Old eager scan of chats directories (for comparison), creating a
+    JSON file object for each chat and storing each default config
+    property of chats without config file with a read-modify-write.
+    '''
+    files_config_list = []
+    for f_chat_id in listdir(chats_dir):
+        file_path = f'{chats_dir}/{f_chat_id}/{CONST["F_CONF"]}'
+        fjson_config = TSjson(file_path)
+        files_config_list.append(
+            {"ID": f_chat_id, "File": fjson_config})
+        if not path.exists(file_path):
+            for key, value in get_default_config_data().items():
+                config_data = fjson_config.read()
+                if not config_data:
+                    config_data = get_default_config_data()
+                if (key in config_data) and (value == config_data[key]):
+                    continue
+                config_data[key] = value
+                fjson_config.write(config_data)
+    return files_config_list
+
+
+def benchmark(num_chats):
+    '''
+    Create the synthetic chats tree and measure the old and new
+    startup times.
+    '''
+    data_dir = mkdtemp()
+    try:
+        CONST["CHATS_DIR"] = f"{data_dir}/chats"
+        create_chats_tree(CONST["CHATS_DIR"], num_chats)
+        _t0 = perf_counter()
+        legacy_initialize_chats(CONST["CHATS_DIR"])
+        legacy_s = perf_counter() - _t0
+        # Restore the chats tree without config files
+        rmtree(CONST["CHATS_DIR"])
+        create_chats_tree(CONST["CHATS_DIR"], num_chats)
+        Global.chat_configs.clear()
+        Global.chat_config_files.clear()
+        CONST["REGEX_URLS"] = REGEX_URLS_TEMPLATE
+        _t0 = perf_counter()
+        initialize_resources()
+        startup_s = perf_counter() - _t0
+        lookups = [
+            FIRST_CHAT_ID - random_randint(0, num_chats - 1)
+            for _ in range(NUM_LOOKUPS)
+        ]
+        _t0 = perf_counter()
+        for chat_id in lookups:
+            get_chat_config(chat_id, "Language")
+        first_access_us = \
+            (perf_counter() - _t0) * 1000000 / NUM_LOOKUPS
+        logger.info("%7d chats | old chats scan: %8.3f s | "
+                    "initialize_resources(): %8.3f s | "
+                    "first access: %8.1f us/chat",
+                    num_chats, legacy_s, startup_s, first_access_us)
+    finally:
+        rmtree(data_dir)
+
+
+###############################################################################
+# Main Function
+###############################################################################
+
+def main(argc, argv):
+    '''
+    Main Function.
+    '''
+    # Disable unused arguments
+    del argc
+    del argv
+    # Don't touch the real Bot data files
+    tmp_dir = mkdtemp()
+    CONST["CAPTCHAS_DIR_IMG"] = f"{tmp_dir}/captchas"
+    CONST["F_ALLOWED_USERS"] = f"{tmp_dir}/allowed_users.txt"
+    CONST["F_ALLOWED_GROUPS"] = f"{tmp_dir}/allowed_groups.txt"
+    CONST["F_BAN_GROUPS"] = f"{tmp_dir}/banned_groups.txt"
+    for num_chats in NUM_CHATS:
+        benchmark(num_chats)
+    rmtree(tmp_dir, ignore_errors=True)
+    return 0
+
+
+###############################################################################
+# Runnable Main Script Detection
+###############################################################################
+
+if __name__ == "__main__":
+    return_code = main(len(sys_argv) - 1, sys_argv[1:])
+    logger.info("Exit (%d)", return_code)
+    sys_exit(return_code)
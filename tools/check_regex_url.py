@@ -5,7 +5,11 @@
 Script:
     check_regex_url.py
 Description:
-    Check the regex URL detection.
+    Check the regex URL detection and measure the throughput of the TLDs
+    prefix tree Regex compared with the flat TLDs alternation Regex.
+Usage:
+    1. Move this script to src/ directory
+    2. Run the script
 '''
 
 ###############################################################################
@@ -18,16 +22,26 @@ import logging
 # Regular Expressions Library
 import re
 
+# Random Library
+from random import choice as random_choice
+from random import seed as random_seed
+
 # System Library
 from sys import argv as sys_argv
 from sys import exit as sys_exit
 
+# Time Library
+from time import perf_counter
+
 # Error Traceback Library
 from traceback import format_exc
 
+# Commons Library
+from commons import regex_trie
+
 # Constants Library
 from constants import (
-    SCRIPT_PATH, CONST, TEXT
+    SCRIPT_PATH, CONST
 )
 
 
@@ -43,13 +57,34 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+###############################################################################
+# Setup
+###############################################################################
+
+# Number of synthetic messages of the benchmark corpus
+NUM_MSGS = 5000
+
+# Benchmark corpus words
+CORPUS_WORDS = [
+    "hello", "everyone", "thanks", "for", "the", "invite", "i", "am",
+    "new", "here", "how", "are", "you", "doing", "today", "price",
+    "is", "9.90", "meeting", "at", "09.00", "version", "3.12.1", "ok",
+    "lol", "see", "you", "later", "e.g.", "i.e.", "etc.", "hi!"
+]
+
+# Benchmark corpus URLs (one of each some messages)
+CORPUS_URLS = [
+    "https://example.com/promo", "free-crypto.io", "www.spam.xyz",
+    "bit.ly/abc123", "join.my-channel.org", "t.me/somechannel"
+]
+
+
 ###############################################################################
 # Functions
 ###############################################################################
 
-def load_urls_regex(file_path):
-    '''Load URL detection Regex from IANA TLD list text file.'''
-    tlds_str = ""
+def load_tlds(file_path):
+    '''Load TLDs list from IANA TLD list text file.'''
     list_file_lines = []
     try:
         with open(file_path, "r", encoding="utf-8") as file:
@@ -62,41 +97,70 @@ def load_urls_regex(file_path):
                 # IANA TLD list file)
                 if line[0] == "#":
                     continue
-                line = line.lower()
-                line = line.replace("\r", "")
-                line = line.replace("\n", "|")
+                line = line.lower().strip()
+                if line == "":
+                    continue
                 list_file_lines.append(line)
     except Exception:
         logger.error(format_exc())
         logger.error("Fail to open file \"%s\"", file_path)
-    if len(list_file_lines) > 0:
-        # Remove last '|' from last TLDs list item
-        num_tlds = len(list_file_lines)
-        last_tld = list_file_lines[num_tlds-1]
-        if last_tld[-1] == '|':
-            last_tld = last_tld[:-1]
-            list_file_lines[num_tlds-1] = last_tld
-        # Add all TLDs substring to the URL Regex
-        tlds_str = "".join(list_file_lines)
-    CONST["REGEX_URLS"] = CONST["REGEX_URLS"].format(tlds_str)
-
-
-def print_regex():
+    return list_file_lines
+
+
+def load_urls_regex(tlds):
+    '''Get URL detection compiled Regex with TLDs prefix tree.'''
+    return re.compile(CONST["REGEX_URLS"].format(regex_trie(tlds)))
+
+
+def load_urls_regex_flat(tlds):
+    '''Get URL detection compiled Regex with flat TLDs alternation.'''
+    return re.compile(CONST["REGEX_URLS"].format("|".join(tlds)))
+
+
+def print_regex(regex):
     print("")
     print("-----------------------")
     print("")
-    print(CONST["REGEX_URLS"])
+    print(regex.pattern)
     print("")
 
 
-def check_url(text):
-    has_url = re.findall(CONST["REGEX_URLS"], text)
+def check_url(regex, text):
+    has_url = regex.findall(text)
     if has_url:
         print(f"{text} - URL")
     else:
         print(f"{text} - NOT URL")
 
 
+def generate_corpus():
+    '''
+    Generate a synthetic corpus of chat messages, where 1 of each 10
+    messages contains an URL.
+    '''
+    random_seed(0)
+    corpus = []
+    for i in range(NUM_MSGS):
+        words = [random_choice(CORPUS_WORDS) for _ in range(12)]
+        if i % 10 == 0:
+            words.insert(6, random_choice(CORPUS_URLS))
+        corpus.append(" ".join(words))
+    return corpus
+
+
+def benchmark(regex, corpus):
+    '''
+    Get number of checked messages per second and number of messages
+    detected with URL.
+    '''
+    num_urls = 0
+    _t0 = perf_counter()
+    for msg in corpus:
+        if regex.search(msg):
+            num_urls = num_urls + 1
+    return (len(corpus) / (perf_counter() - _t0)), num_urls
+
+
 ###############################################################################
 # Main Function
 ###############################################################################
@@ -105,13 +169,27 @@ def main(argc, argv):
     '''
     Main Function.
     '''
-    print_regex()
-    load_urls_regex(f'{SCRIPT_PATH}/{CONST["F_TLDS"]}')
-    print_regex()
-    check_url("hola.mundo")
-    check_url("asdf.com")
-    check_url("9.90")
-    check_url("09.00")
+    # Disable unused arguments
+    del argc
+    del argv
+    tlds = load_tlds(f'{SCRIPT_PATH}/{CONST["F_TLDS"]}')
+    regex = load_urls_regex(tlds)
+    regex_flat = load_urls_regex_flat(tlds)
+    print_regex(regex)
+    check_url(regex, "hola.mundo")
+    check_url(regex, "asdf.com")
+    check_url(regex, "9.90")
+    check_url(regex, "09.00")
+    corpus = generate_corpus()
+    flat_rate, flat_urls = benchmark(regex_flat, corpus)
+    trie_rate, trie_urls = benchmark(regex, corpus)
+    logger.info("Flat alternation: %10.1f msgs/s (%d with URL)",
+                flat_rate, flat_urls)
+    logger.info("Prefix tree:      %10.1f msgs/s (%d with URL)",
+                trie_rate, trie_urls)
+    if flat_urls != trie_urls:
+        logger.error("Regex detections mismatch")
+        return 1
     return 0
 
 